@@ -39,6 +39,7 @@ from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
+from retail_analytics import ModelRegistry, score_customers, train_model_zoo
 import warnings
 warnings.filterwarnings('ignore')
 %matplotlib inline
@@ -191,29 +192,22 @@ if customer_features is not None:
         notebook.cells.append(create_markdown_cell("""## 4. Model Training and Evaluation
 Training Random Forest model and evaluating its performance."""))
 
-        notebook.cells.append(create_code_cell("""def train_and_evaluate_model(X_train_scaled, X_test_scaled, y_train, y_test, feature_names):
+        notebook.cells.append(create_code_cell("""def train_and_evaluate_model(X_train_scaled, X_test_scaled, y_train, y_test, feature_names, scaler):
     '''Train and evaluate the Random Forest model'''
     try:
-        # Train model
-        rf_model = RandomForestRegressor(
-            n_estimators=100,
-            max_depth=10,
-            random_state=42
+        # Train model, or reuse the registered one fitted on the same features and data
+        models, results = train_model_zoo(
+            X_train_scaled, y_train, X_test_scaled, y_test,
+            models={'Random Forest': RandomForestRegressor(n_estimators=100, max_depth=10, random_state=42)},
+            registry=ModelRegistry(), feature_names=list(feature_names), scaler=scaler
         )
-        rf_model.fit(X_train_scaled, y_train)
+        rf_model = models['Random Forest']
+        metrics = results.loc['Random Forest']
         
-        # Make predictions
-        y_pred = rf_model.predict(X_test_scaled)
-        
-        # Calculate metrics
-        r2 = r2_score(y_test, y_pred)
-        rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-        mae = mean_absolute_error(y_test, y_pred)
-        
-        print("Model Training Results:")
-        print(f"R² Score: {r2:.4f}")
-        print(f"RMSE: {rmse:.2f}")
-        print(f"MAE: {mae:.2f}")
+        print("Model Training Results" + (" (from model registry):" if metrics['Cached'] else ":"))
+        print(f"R² Score: {metrics['R2 Score']:.4f}")
+        print(f"RMSE: {metrics['RMSE']:.2f}")
+        print(f"MAE: {metrics['MAE']:.2f}")
         
         # Feature importance
         feature_importance = pd.DataFrame({
@@ -238,21 +232,39 @@ Training Random Forest model and evaluating its performance."""))
 # Train and evaluate model
 if all(v is not None for v in [X_train_scaled, X_test_scaled, y_train, y_test]):
     rf_model, feature_importance = train_and_evaluate_model(
-        X_train_scaled, X_test_scaled, y_train, y_test, feature_names
+        X_train_scaled, X_test_scaled, y_train, y_test, feature_names, scaler
     )"""))
 
         # Add prediction section
         notebook.cells.append(create_markdown_cell("""## 5. Making Predictions
 Using the trained model to make predictions."""))
 
-        notebook.cells.append(create_code_cell("""def make_predictions(model, scaler, customer_features, top_n=10):
+        notebook.cells.append(create_code_cell("""def make_predictions(model, scaler, customer_features, top_n=10, output_path=None, chunk_size=100_000, n_jobs=1):
     '''Make predictions for customer revenue'''
     try:
-        if model is None or scaler is None:
-            raise ValueError("Model or scaler not available")
+        if (model is None) != (scaler is None):
+            raise ValueError("Pass model and scaler together, or neither to load both from the registry")
+        if model is None:
+            # Load the newest registered Random Forest with its scaler
+            model, scaler, meta = ModelRegistry().latest('Random Forest', features=customer_features.columns)
+            if scaler is None:
+                raise ValueError("The registered Random Forest was stored without its scaler")
+            X_pred = customer_features[meta['features']]
+        else:
+            X_pred = customer_features.drop('TotalRevenue', axis=1)
+        
+        if output_path is not None:
+            # Batch mode: score fixed-size chunks into a Parquet file and keep only the top customers
+            top, n_scored = score_customers(
+                customer_features, model, scaler, X_pred.columns, target='TotalRevenue',
+                output_path=output_path, chunk_size=chunk_size, top_n=top_n, n_jobs=n_jobs
+            )
+            print(f"Scored {n_scored:,} customers into {output_path}")
+            print(f"Top {top_n} Customers by Predicted Revenue:")
+            display(top)
+            return top
         
         # Prepare features for prediction
-        X_pred = customer_features.drop('TotalRevenue', axis=1)
         X_pred_scaled = scaler.transform(X_pred)
         
         # Make predictions
@@ -269,7 +281,7 @@ Using the trained model to make predictions."""))
         results['Prediction_Error'] = abs(results['Actual_Revenue'] - results['Predicted_Revenue'])
         results['Error_Percentage'] = (results['Prediction_Error'] / results['Actual_Revenue']) * 100
         
-        print("Top 10 Customers by Predicted Revenue:")
+        print(f"Top {top_n} Customers by Predicted Revenue:")
         display(results.nlargest(top_n, 'Predicted_Revenue'))
         
         # Plot actual vs predicted
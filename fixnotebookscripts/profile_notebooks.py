@@ -0,0 +1,87 @@
+import argparse
+import sys
+from pathlib import Path
+
+import nbformat
+
+# Import the notebook list from next to this file, whatever the working directory
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
+from use_retail_analytics import NOTEBOOKS  # noqa: E402
+
+# The notebooks live in the repository root, one level above this script
+DEFAULT_NOTEBOOKS = [str(SCRIPT_DIR.parent / name) for name in NOTEBOOKS]
+
+PROFILE_CELL_TAG = 'retail-profile'
+
+PROFILE_CELL = """# Per-cell timing and memory profile, written to profiles/ after every cell
+# (remove with: python fixnotebookscripts/profile_notebooks.py remove)
+from retail_analytics.profiling import profile_cells
+profile_cells({notebook!r}{options})"""
+
+
+def is_profile_cell(cell):
+    """True for the cell added by add_profiling"""
+    return PROFILE_CELL_TAG in cell.get('metadata', {}).get('tags', [])
+
+
+def add_profiling(notebook_path, trace_memory=True):
+    """
+    Insert the profiling cell at the top of a notebook, once. The kernel
+    starts in the notebook's directory, so the report goes to profiles/
+    next to it. trace_memory=False skips tracemalloc, which slows
+    allocation-heavy cells down, and keeps only timing and RSS.
+    """
+    with open(notebook_path, 'r', encoding='utf-8') as f:
+        nb = nbformat.read(f, as_version=4)
+    if any(is_profile_cell(cell) for cell in nb.cells):
+        return False
+    options = '' if trace_memory else ', trace_memory=False'
+    cell = nbformat.v4.new_code_cell(PROFILE_CELL.format(notebook=Path(notebook_path).name,
+                                                         options=options))
+    cell.metadata['tags'] = [PROFILE_CELL_TAG]
+    if nb.nbformat_minor < 5:
+        # Cell ids only exist from nbformat 4.5 on
+        del cell['id']
+    nb.cells.insert(0, cell)
+    with open(notebook_path, 'w', encoding='utf-8') as f:
+        nbformat.write(nb, f)
+    return True
+
+
+def remove_profiling(notebook_path):
+    """Delete the profiling cell from a notebook"""
+    with open(notebook_path, 'r', encoding='utf-8') as f:
+        nb = nbformat.read(f, as_version=4)
+    cells = [cell for cell in nb.cells if not is_profile_cell(cell)]
+    if len(cells) == len(nb.cells):
+        return False
+    nb.cells = cells
+    with open(notebook_path, 'w', encoding='utf-8') as f:
+        nbformat.write(nb, f)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add or remove per-cell profiling in the notebooks")
+    parser.add_argument('action', choices=['add', 'remove'])
+    parser.add_argument('notebooks', nargs='*', default=DEFAULT_NOTEBOOKS)
+    parser.add_argument('--no-tracemalloc', action='store_true',
+                        help="Measure time and RSS only, without tracemalloc overhead")
+    args = parser.parse_args()
+
+    if args.action == 'add':
+        def update(nb_path):
+            return add_profiling(nb_path, trace_memory=not args.no_tracemalloc)
+    else:
+        update = remove_profiling
+    verb = 'Added profiling to' if args.action == 'add' else 'Removed profiling from'
+    for nb_path in args.notebooks:
+        try:
+            print(f"{verb} {nb_path}" if update(nb_path) else f"{nb_path}: unchanged")
+        except Exception as e:
+            print(f"Error updating {nb_path}: {e}")
+
+
+if __name__ == '__main__':
+    main()
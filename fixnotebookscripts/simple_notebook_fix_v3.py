@@ -25,6 +25,7 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 from sklearn.cluster import KMeans
 from datetime import datetime, timedelta
+from retail_analytics import rfm_segments
 import warnings
 warnings.filterwarnings('ignore')
 %matplotlib inline
@@ -77,34 +78,9 @@ Identifying high-value customers and segments for targeted marketing.'''))
     
     cells.append(nbformat.v4.new_code_cell('''# Marketing Optimization Analysis
 try:
-    # RFM Segmentation
-    rfm_scores = customer_features.copy()
-    
-    # Convert metrics to scores 1-5
-    for metric in ['Recency', 'Frequency', 'TotalRevenue']:
-        labels = range(5, 0, -1) if metric == 'Recency' else range(1, 6)
-        rfm_scores[f'{metric}_Score'] = pd.qcut(rfm_scores[metric], q=5, labels=labels)
-    
-    # Calculate RFM Score
-    rfm_scores['RFM_Score'] = (rfm_scores['Recency_Score'].astype(str) + 
-                              rfm_scores['Frequency_Score'].astype(str) + 
-                              rfm_scores['TotalRevenue_Score'].astype(str))
-    
-    # Customer Segmentation
-    def segment_customers(row):
-        r, f, m = row['Recency_Score'], row['Frequency_Score'], row['TotalRevenue_Score']
-        if r >= 4 and f >= 4 and m >= 4:
-            return 'Champions'
-        elif r >= 3 and f >= 3 and m >= 3:
-            return 'Loyal Customers'
-        elif r >= 3 and f >= 1 and m >= 2:
-            return 'Potential Loyalists'
-        elif r <= 2 and f <= 2 and m <= 2:
-            return 'Lost Customers'
-        else:
-            return 'Average Customers'
-    
-    rfm_scores['Customer_Segment'] = rfm_scores.apply(segment_customers, axis=1)
+    # RFM Segmentation: quantile scores 1-5 (recency reversed), an integer
+    # RFM_Score such as 545 and a Customer_Segment from the rule table
+    rfm_scores = rfm_segments(customer_features, metrics=['Recency', 'Frequency', 'TotalRevenue'])
     
     # Visualize segments
     plt.figure(figsize=(10, 6))
@@ -0,0 +1,721 @@
+import re
+
+import nbformat
+
+NOTEBOOKS = [
+    'LalitNayyarIIMKMod4_analysis_fin.ipynb',
+    'LalitNayyarIIMKMod4_descriptive_analysis_fin.ipynb',
+    'LalitNayyarIIMKMod4_behavior_diagnostic_analysis_fin.ipynb',
+    'LalitNayyarIIMKMod4_predictive_analysis_fin.ipynb'
+]
+
+# Package names a notebook may use; each notebook imports only those it uses
+PACKAGE_NAMES = [
+    'load_retail_data',
+    'load_clean_data',
+    'load_feature_store',
+    'clean_data',
+    'duplicated_rows',
+    'compute_customer_features',
+    'create_customer_features',
+    'preference_matrix',
+    'segment_preferences',
+    'segment_top_products',
+    'kmeans_sweep',
+    'segment_customers',
+    'default_model_zoo',
+    'train_model_zoo',
+    'train_prediction_models',
+    'ModelRegistry',
+    'make_predictions',
+    'price_elasticity',
+    'product_affinity',
+    'cohort_matrices',
+    'CorrelationAccumulator',
+]
+PACKAGE_IMPORT_PATTERN = r'^from retail_analytics import (?:\([^)]*\)|[^\n]*)'
+
+# (old, new) source replacements applied to every code cell
+REPLACEMENTS = [
+    ("pd.read_excel('Online Retail.xlsx')", "load_retail_data('Online Retail.xlsx')"),
+    ("df.duplicated().sum()", "duplicated_rows(df).sum()"),
+]
+
+# The analysis notebooks read the cached cleaned dataset instead of
+# re-running clean_data on every kernel start
+LOAD_CLEAN_DATA = ("df_clean = clean_data(df)\n", "df_clean = load_clean_data('Online Retail.xlsx')\n")
+
+# Customer aggregates in the diagnostic notebook come from the shared
+# feature engine instead of separate groupbys
+CUSTOMER_LIFETIME = ("""customer_lifetime = df_clean.groupby('CustomerID').agg({
+    'PurchaseMonth': ['nunique', 'min', 'max'],
+    'InvoiceNo': 'count',
+    'TotalAmount': 'sum'
+}).reset_index()
+""", """customer_lifetime = compute_customer_features(df_clean)[[
+    'active_months', 'first_purchase', 'last_purchase', 'purchase_count', 'total_spent'
+]].reset_index()
+""")
+
+CUSTOMER_METRICS = ("""    customer_metrics = df_customers.groupby('CustomerID').agg({
+        'InvoiceDate': ['min', 'max', 'count'],
+        'TotalAmount': ['sum', 'mean'],
+        'Quantity': 'sum',
+        'Description': 'nunique'
+    })
+    
+    # Flatten column names
+    customer_metrics.columns = [
+        'first_purchase', 'last_purchase', 'purchase_count',
+        'total_spent', 'avg_order_value', 'total_items',
+        'unique_products'
+    ]
+""", """    customer_metrics = compute_customer_features(df_customers)[[
+        'first_purchase', 'last_purchase', 'purchase_count',
+        'total_spent', 'avg_order_value', 'total_items',
+        'unique_products'
+    ]].copy()
+""")
+
+# Both read the persisted customer feature store, built once per version of
+# the cleaned data, instead of aggregating the transactions again
+FEATURE_STORE_LIFETIME = ("customer_lifetime = compute_customer_features(df_clean)[[",
+                          "customer_lifetime = load_feature_store('Online Retail.xlsx').features()[[")
+
+FEATURE_STORE_METRICS = ("    customer_metrics = compute_customer_features(df_customers)[[",
+                         "    customer_metrics = load_feature_store('Online Retail.xlsx').features()[[")
+
+# The diagnostic marketing cell builds a sparse preference matrix from
+# category codes instead of a dense groupby(...).unstack() table
+PREFERENCE_SEGMENTS = ("""    # Create customer product preferences matrix
+    customer_preferences = df_clean.groupby(['CustomerID', 'Description'])['Quantity'].sum().unstack(fill_value=0)
+    
+    # Perform customer segmentation using K-means
+    scaler = StandardScaler()
+    customer_preferences_scaled = scaler.fit_transform(customer_preferences)
+    
+    # Find optimal number of clusters
+    inertias = []
+    K = range(1, 6)
+    for k in K:
+        kmeans = KMeans(n_clusters=k, random_state=42)
+        kmeans.fit(customer_preferences_scaled)
+        inertias.append(kmeans.inertia_)
+    
+    # Apply K-means clustering
+    kmeans = KMeans(n_clusters=3, random_state=42)
+    customer_segments = kmeans.fit_predict(customer_preferences_scaled)
+    
+    # Analyze segment characteristics
+    customer_preferences['Segment'] = customer_segments
+    segment_profiles = customer_preferences.groupby('Segment').agg(['mean', 'count'])
+    
+    # Get top products for each segment
+    top_products_per_segment = {}
+    for segment in range(3):
+        segment_avg = customer_preferences[customer_preferences['Segment'] == segment].mean()
+        top_products = segment_avg.nlargest(5)
+        top_products_per_segment[f'Segment {segment}'] = top_products
+    
+""", """    # Sparse customer x product preferences matrix (one entry per purchased pair)
+    customer_preferences, preference_customers, preference_products = preference_matrix(df_clean)
+    
+    # Perform customer segmentation using K-means on a truncated SVD embedding
+    customer_segments, preference_embedding = segment_preferences(customer_preferences, n_clusters=3)
+    
+    # Find optimal number of clusters
+    inertias = []
+    K = range(1, 6)
+    for k in K:
+        kmeans = KMeans(n_clusters=k, random_state=42)
+        kmeans.fit(preference_embedding)
+        inertias.append(kmeans.inertia_)
+    
+    # Get top products for each segment
+    top_products_per_segment = segment_top_products(
+        customer_preferences, customer_segments, preference_products, n=5
+    )
+    
+""")
+
+# Elbow searches fit every candidate k through kmeans_sweep, which runs
+# them in a process pool and picks k from the inertia curve
+PREFERENCE_K_SWEEP = ("""    # Find optimal number of clusters
+    inertias = []
+    K = range(1, 6)
+    for k in K:
+        kmeans = KMeans(n_clusters=k, random_state=42)
+        kmeans.fit(preference_embedding)
+        inertias.append(kmeans.inertia_)
+""", """    # Find optimal number of clusters (k = 1..5 fitted in parallel)
+    best_k, k_curve = kmeans_sweep(preference_embedding, k_values=range(1, 6))
+    K, inertias = k_curve.index, k_curve['inertia']
+""")
+
+SEGMENT_K_SWEEP = ("""        # Find optimal number of clusters
+        inertias = []
+        for k in range(1, 11):
+            kmeans = KMeans(n_clusters=k, random_state=42)
+            kmeans.fit(features_scaled)
+            inertias.append(kmeans.inertia_)
+        
+        # Plot elbow curve
+        plt.figure(figsize=(10, 5))
+        plt.plot(range(1, 11), inertias, marker='o')
+""", """        # Find optimal number of clusters (k = 1..10 fitted in parallel)
+        optimal_k, k_curve = kmeans_sweep(features_scaled, k_values=range(1, 11))
+        
+        # Plot elbow curve
+        plt.figure(figsize=(10, 5))
+        plt.plot(k_curve.index, k_curve['inertia'], marker='o')
+        plt.axvline(optimal_k, color='grey', linestyle='--')
+""")
+
+SEGMENT_OPTIMAL_K = ("""        # Perform clustering with optimal k
+        optimal_k = 4  # Based on elbow curve
+""", """        # Perform clustering with the k at the elbow of the curve
+""")
+
+# Segmentation now comes from the package; the notebook keeps only the plots
+SEGMENT_CUSTOMERS = ("""# Perform segmentation
+segmented_customers = segment_customers(customer_features)""", """# Segment customers with KMeans at the elbow of a parallel k sweep
+try:
+    segmented_customers, cluster_analysis, k_curve = segment_customers(customer_features)
+    optimal_k = len(cluster_analysis)
+    
+    # Plot elbow curve
+    plt.figure(figsize=(10, 5))
+    plt.plot(k_curve.index, k_curve['inertia'], marker='o')
+    plt.axvline(optimal_k, color='grey', linestyle='--')
+    plt.xlabel('Number of Clusters (k)')
+    plt.ylabel('Inertia')
+    plt.title('Elbow Method for Optimal k')
+    plt.show()
+    
+    print("Cluster Analysis:")
+    display(cluster_analysis)
+    
+    # Visualize clusters
+    plt.figure(figsize=(15, 5))
+    
+    plt.subplot(131)
+    sns.scatterplot(data=segmented_customers, x='total_spent', y='purchase_count', hue='Cluster', palette='deep')
+    plt.title('Clusters: Spending vs Purchase Frequency')
+    
+    plt.subplot(132)
+    sns.scatterplot(data=segmented_customers, x='avg_order_value', y='unique_products', hue='Cluster', palette='deep')
+    plt.title('Clusters: Order Value vs Product Variety')
+    
+    plt.subplot(133)
+    cluster_sizes = segmented_customers['Cluster'].value_counts()
+    plt.pie(cluster_sizes, labels=[f'Cluster {i}' for i in range(len(cluster_sizes))], autopct='%1.1f%%')
+    plt.title('Cluster Sizes')
+    
+    plt.tight_layout()
+    plt.show()
+except Exception as e:
+    print(f"Error in customer segmentation: {e}")""")
+
+# The predictive models are fitted concurrently by the model-zoo trainer,
+# which also times each fit and adds histogram gradient boosting
+MODEL_ZOO = ("""        # Train models
+        models = {
+            'Random Forest': RandomForestRegressor(n_estimators=100, random_state=42),
+            'Gradient Boosting': GradientBoostingRegressor(random_state=42)
+        }
+        
+        results = {}
+        for name, model in models.items():
+            # Train model
+            model.fit(X_train_scaled, y_train)
+            
+            # Make predictions
+            y_pred = model.predict(X_test_scaled)
+            
+            # Calculate metrics
+            results[name] = {
+                'R2 Score': r2_score(y_test, y_pred),
+                'MAE': mean_absolute_error(y_test, y_pred),
+                'RMSE': np.sqrt(mean_squared_error(y_test, y_pred))
+            }
+            
+            # Feature importance
+            if name == 'Random Forest':
+                importance = pd.DataFrame({
+                    'Feature': X.columns,
+                    'Importance': model.feature_importances_
+                }).sort_values('Importance', ascending=False)
+                
+                plt.figure(figsize=(10, 5))
+                sns.barplot(data=importance, x='Importance', y='Feature')
+                plt.title(f'{name} Feature Importance')
+                plt.show()
+        
+        # Display results
+        results_df = pd.DataFrame(results).round(3)
+""", """        # Train the candidate models concurrently, one worker process each
+        models, results_df = train_model_zoo(
+            X_train_scaled, y_train, X_test_scaled, y_test,
+            models=default_model_zoo(hist_gradient_boosting=True)
+        )
+        
+        # Feature importance
+        importance = pd.DataFrame({
+            'Feature': X.columns,
+            'Importance': models['Random Forest'].feature_importances_
+        }).sort_values('Importance', ascending=False)
+        
+        plt.figure(figsize=(10, 5))
+        sns.barplot(data=importance, x='Importance', y='Feature')
+        plt.title('Random Forest Feature Importance')
+        plt.show()
+        
+        # Display results
+        results_df = results_df.round(3)
+""")
+
+# Fitted models are kept in the local model registry, keyed by the feature
+# set, the training data and the model parameters, so unchanged reruns reuse them
+MODEL_REGISTRY = ("""            models=default_model_zoo(hist_gradient_boosting=True)
+        )
+""", """            models=default_model_zoo(hist_gradient_boosting=True),
+            registry=ModelRegistry(), feature_names=list(X.columns), scaler=scaler
+        )
+""")
+
+# The predictive models are trained by the package's train_prediction_models,
+# so the notebook and the command-line analyses share one implementation
+TRAIN_PREDICTION_MODELS = ('''def train_prediction_models(features):
+    """Train and evaluate prediction models"""
+    if features is None:
+        return None
+        
+    try:
+        # Prepare features for prediction
+        X = features[['purchase_count', 'avg_order_value', 'unique_products', 'customer_lifetime']]
+        y = features['total_spent']
+        
+        # Split data
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        
+        # Scale features
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
+        
+        # Train the candidate models concurrently, one worker process each
+        models, results_df = train_model_zoo(
+            X_train_scaled, y_train, X_test_scaled, y_test,
+            models=default_model_zoo(hist_gradient_boosting=True),
+            registry=ModelRegistry(), feature_names=list(X.columns), scaler=scaler
+        )
+        
+        # Feature importance
+        importance = pd.DataFrame({
+            'Feature': X.columns,
+            'Importance': models['Random Forest'].feature_importances_
+        }).sort_values('Importance', ascending=False)
+        
+        plt.figure(figsize=(10, 5))
+        sns.barplot(data=importance, x='Importance', y='Feature')
+        plt.title('Random Forest Feature Importance')
+        plt.show()
+        
+        # Display results
+        results_df = results_df.round(3)
+        print("Model Performance Metrics:")
+        display(results_df)
+        
+        return models, results_df
+        
+    except Exception as e:
+        print(f"Error in predictive modeling: {e}")
+        return None
+
+# Train models
+model_results = train_prediction_models(customer_features)''', '''# Train and evaluate the prediction models with the package trainer
+model_columns = ['purchase_count', 'avg_order_value', 'unique_products', 'customer_lifetime']
+try:
+    # The candidate models are fitted concurrently and kept in the model registry
+    models, scaler, results_df = train_prediction_models(
+        customer_features, feature_columns=model_columns,
+        models=default_model_zoo(hist_gradient_boosting=True), registry=ModelRegistry()
+    )
+    
+    # Feature importance
+    importance = pd.DataFrame({
+        'Feature': model_columns,
+        'Importance': models['Random Forest'].feature_importances_
+    }).sort_values('Importance', ascending=False)
+    
+    plt.figure(figsize=(10, 5))
+    sns.barplot(data=importance, x='Importance', y='Feature')
+    plt.title('Random Forest Feature Importance')
+    plt.show()
+    
+    # Display results
+    print("Model Performance Metrics:")
+    display(results_df.round(3))
+except Exception as e:
+    print(f"Error in predictive modeling: {e}")
+    models, scaler = None, None''')
+
+# Predictions use the model and scaler the training cell just produced
+TRAINED_MODEL_PREDICTIONS = ("""# Score all customers with the registered Random Forest
+try:
+    prediction_results = make_predictions(customer_features, model_name='Random Forest')
+""", """# Score all customers with the Random Forest trained above
+try:
+    if models is None:
+        raise ValueError("the training cell did not produce any models")
+    prediction_results = make_predictions(customer_features, models['Random Forest'], scaler,
+                                          feature_columns=model_columns)
+""")
+
+# The pricing cell fits a log-log elasticity per product from daily price and
+# quantity instead of one straight line through the whole product table
+PRICE_ELASTICITY = ("""    # Add trend line
+    z = np.polyfit(product_price_analysis['avg_price'], product_price_analysis['total_quantity'], 1)
+    p = np.poly1d(z)
+    plt.plot(product_price_analysis['avg_price'], p(product_price_analysis['avg_price']), "r--", alpha=0.8)
+    
+    plt.tight_layout()
+    plt.show()
+""", """    plt.tight_layout()
+    plt.show()
+    
+    # Per-product log-log price elasticity from daily price and quantity
+    elasticity = price_elasticity(df_clean, product_col='Description')
+    product_price_analysis = product_price_analysis.join(elasticity[['elasticity', 'r_squared', 'n_days']])
+    
+    print("\\nPrice elasticity across products:")
+    display(elasticity['elasticity'].describe().round(2))
+    
+    print("\\nMost price-sensitive products:")
+    display(product_price_analysis.dropna(subset=['elasticity']).nsmallest(10, 'elasticity')[
+        ['avg_price', 'price_range', 'elasticity', 'r_squared', 'n_days']
+    ])
+""")
+
+# The retention cell adds first-purchase-month cohort matrices after the
+# single repeat-customer rate
+COHORT_RETENTION = ("""    print(f"Retention Rate: {retention_rate:.2f}%")
+    
+except Exception as e:
+    print(f"Error in retention analysis: {e}")
+""", """    print(f"Retention Rate: {retention_rate:.2f}%")
+    
+    # Monthly cohorts: customers and revenue by months since first purchase
+    cohort_customers, cohort_retention, cohort_revenue = cohort_matrices(df_customers)
+    
+    print("\\nMonthly Cohort Retention (%):")
+    display((cohort_retention * 100).round(1))
+    print("\\nMonthly Cohort Revenue:")
+    display(cohort_revenue.round(0))
+    
+    plt.figure(figsize=(14, 8))
+    sns.heatmap(cohort_retention, annot=True, fmt='.0%', cmap='Blues')
+    plt.title('Customer Retention by First-Purchase Month')
+    plt.xlabel('Months Since First Purchase')
+    plt.ylabel('Cohort')
+    plt.tight_layout()
+    plt.show()
+    
+except Exception as e:
+    print(f"Error in retention analysis: {e}")
+""")
+
+# Behaviour correlations come from mergeable streaming moments, which give
+# the same matrix as DataFrame.corr() and can be fed batch by batch
+BEHAVIOUR_CORRELATIONS = ("""    # Calculate correlations
+    correlations = customer_analysis.corr()['TotalSpent'].sort_values(ascending=False)
+""", """    # Calculate correlations from mergeable running moments
+    behaviour_moments = CorrelationAccumulator(customer_analysis.columns).update(customer_analysis)
+    correlation_matrix = behaviour_moments.corr()
+    correlations = correlation_matrix['TotalSpent'].sort_values(ascending=False)
+""")
+
+BEHAVIOUR_HEATMAP = ("""    sns.heatmap(customer_analysis.corr(), annot=True, cmap='coolwarm', center=0)
+""", """    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0)
+""")
+
+# (old, new) replacements applied to markdown cells
+MARKDOWN_REPLACEMENTS = [
+    ("Every customer is scored with the newest registered Random Forest, loaded from the "
+     "local model registry together with its scaler and feature list.",
+     "Every customer is scored with the Random Forest trained above and the scaler fitted on "
+     "its training data. The newest registry entry could come from another run, so it is not "
+     "used here."),
+]
+
+# Replacements for a single notebook
+NOTEBOOK_REPLACEMENTS = {
+    'LalitNayyarIIMKMod4_analysis_fin.ipynb': [
+        ("df_clean = clean_data(df)\n", "df_clean = clean_data(df, drop_duplicates=True)\n"),
+    ],
+    'LalitNayyarIIMKMod4_descriptive_analysis_fin.ipynb': [LOAD_CLEAN_DATA],
+    'LalitNayyarIIMKMod4_behavior_diagnostic_analysis_fin.ipynb': [
+        LOAD_CLEAN_DATA, CUSTOMER_LIFETIME, CUSTOMER_METRICS, FEATURE_STORE_LIFETIME,
+        FEATURE_STORE_METRICS, PREFERENCE_SEGMENTS,
+        PREFERENCE_K_SWEEP, PRICE_ELASTICITY, COHORT_RETENTION, BEHAVIOUR_CORRELATIONS,
+        BEHAVIOUR_HEATMAP
+    ],
+    'LalitNayyarIIMKMod4_predictive_analysis_fin.ipynb': [
+        LOAD_CLEAN_DATA, MODEL_ZOO, MODEL_REGISTRY, TRAIN_PREDICTION_MODELS,
+        TRAINED_MODEL_PREDICTIONS, SEGMENT_K_SWEEP, SEGMENT_OPTIMAL_K, SEGMENT_CUSTOMERS
+    ],
+}
+
+# New sections: (source prefix of the cell to insert after, markdown, code)
+PRODUCT_AFFINITY = (
+    '# Analyze customer preferences for personalized marketing',
+    """### 8. Product Affinity Analysis
+Identify products that are frequently bought together using invoice baskets.""",
+    """# Analyze which products are bought together
+try:
+    # Frequent itemsets and association rules over InvoiceNo x StockCode baskets
+    itemsets, rules = product_affinity(df_clean, invoice_col='InvoiceNo', item_col='StockCode',
+                                       min_support=0.01, max_len=3,
+                                       min_confidence=0.2, min_lift=1.0)
+    
+    product_names = df_clean.groupby('StockCode', observed=True)['Description'].first()
+    
+    def describe_products(codes):
+        return ' + '.join(str(product_names.get(code, code)) for code in codes)
+    
+    print(f"Frequent itemsets: {len(itemsets)} ({(itemsets['length'] > 1).sum()} with 2+ products)")
+    print(f"Association rules: {len(rules)}")
+    
+    top_rules = rules.head(10).copy()
+    top_rules['antecedent'] = top_rules['antecedent'].map(describe_products)
+    top_rules['consequent'] = top_rules['consequent'].map(lambda code: describe_products([code]))
+    print("\\nTop 10 Product Affinity Rules by Lift:")
+    display(top_rules.round(3))
+    
+    # Visualize rule strength
+    plt.figure(figsize=(10, 6))
+    plt.scatter(rules['support'], rules['confidence'], c=rules['lift'], cmap='viridis', alpha=0.6)
+    plt.colorbar(label='Lift')
+    plt.xlabel('Support')
+    plt.ylabel('Confidence')
+    plt.title('Product Affinity Rules')
+    plt.tight_layout()
+    plt.show()
+except Exception as e:
+    print(f"Error in product affinity analysis: {e}")""",
+)
+
+CUSTOMER_PREDICTIONS = (
+    '# Train and evaluate the prediction models',
+    """### 3.1 Customer Revenue Predictions
+Every customer is scored with the Random Forest trained above and the scaler fitted on its training data. The newest registry entry could come from another run, so it is not used here.""",
+    """# Score all customers with the Random Forest trained above
+try:
+    if models is None:
+        raise ValueError("the training cell did not produce any models")
+    prediction_results = make_predictions(customer_features, models['Random Forest'], scaler,
+                                          feature_columns=model_columns)
+    print("Top 10 Customers by Predicted Revenue:")
+    display(prediction_results.nlargest(10, 'Predicted_Revenue'))
+    
+    # Plot actual vs predicted
+    max_revenue = prediction_results['Actual_Revenue'].max()
+    plt.figure(figsize=(10, 6))
+    plt.scatter(prediction_results['Actual_Revenue'], prediction_results['Predicted_Revenue'], alpha=0.5)
+    plt.plot([0, max_revenue], [0, max_revenue], 'r--')
+    plt.xlabel('Actual Revenue')
+    plt.ylabel('Predicted Revenue')
+    plt.title('Actual vs Predicted Revenue')
+    plt.tight_layout()
+    plt.show()
+except Exception as e:
+    print(f"Error in making predictions: {e}")""",
+)
+
+NOTEBOOK_SECTIONS = {
+    'LalitNayyarIIMKMod4_behavior_diagnostic_analysis_fin.ipynb': [PRODUCT_AFFINITY],
+    'LalitNayyarIIMKMod4_predictive_analysis_fin.ipynb': [CUSTOMER_PREDICTIONS],
+}
+
+# Inline function definitions that now come from the package
+PACKAGE_FUNCTIONS = ['clean_data', 'create_customer_features', 'segment_customers']
+
+# Comment that earlier versions of this script left in place of a removed definition
+PLACEHOLDER_PATTERN = r'# \w+ is imported from the retail_analytics package'
+
+
+def clear_outputs(cell):
+    """Forget the outputs of a code cell whose source changed"""
+    cell.outputs = []
+    cell.execution_count = None
+
+
+def remove_function_definition(source, name):
+    """Remove a (possibly indented) def block from cell source"""
+    lines = source.split('\n')
+    result = []
+    i = 0
+    while i < len(lines):
+        match = re.match(rf'^(\s*)def {name}\(', lines[i])
+        if not match:
+            result.append(lines[i])
+            i += 1
+            continue
+        indent = len(match.group(1))
+        # Drop a comment that introduced the definition
+        if result and result[-1].strip().startswith('#') and \
+                len(result[-1]) - len(result[-1].lstrip()) == indent:
+            result.pop()
+        i += 1
+        # Skip the body: blank lines and anything indented deeper than the def
+        while i < len(lines) and (not lines[i].strip() or
+                                  len(lines[i]) - len(lines[i].lstrip()) > indent):
+            i += 1
+    return '\n'.join(result).strip('\n')
+
+
+def package_import(nb):
+    """retail_analytics import of the PACKAGE_NAMES the notebook's code uses, or None"""
+    code = '\n'.join(re.sub(PACKAGE_IMPORT_PATTERN, '', cell.source, flags=re.M)
+                     for cell in nb.cells if cell.cell_type == 'code')
+    names = [name for name in PACKAGE_NAMES if re.search(rf'\b{name}\b', code)]
+    if not names:
+        return None
+    statement = f"from retail_analytics import {', '.join(names)}"
+    if len(statement) <= 79:
+        return statement
+    return 'from retail_analytics import (\n    ' + ',\n    '.join(names) + '\n)'
+
+
+def add_package_import(nb):
+    """
+    Add or refresh the retail_analytics import after the pandas import.
+    Returns True if the notebook changed.
+    """
+    statement = package_import(nb)
+    if statement is None:
+        return False
+    for cell in nb.cells:
+        if cell.cell_type != 'code':
+            continue
+        if re.search(PACKAGE_IMPORT_PATTERN, cell.source, flags=re.M):
+            source = re.sub(PACKAGE_IMPORT_PATTERN, lambda m: statement,
+                            cell.source, count=1, flags=re.M)
+            if source == cell.source:
+                return False
+            cell.source = source
+            clear_outputs(cell)
+            return True
+    for cell in nb.cells:
+        if cell.cell_type == 'code' and 'import pandas as pd' in cell.source:
+            cell.source = cell.source.replace(
+                'import pandas as pd',
+                f'import pandas as pd\n{statement}',
+                1
+            )
+            clear_outputs(cell)
+            return True
+    nb.cells.insert(0, nbformat.v4.new_code_cell(statement))
+    return True
+
+
+def remove_redundant_cells(nb):
+    """
+    Delete empty code cells and code cells repeating an earlier cell, along
+    with a markdown heading that only repeats an earlier one. Returns the
+    number of cells deleted.
+    """
+    seen = set()
+    cells = []
+    for cell in nb.cells:
+        if cell.cell_type == 'code':
+            if not cell.source.strip() or cell.source in seen:
+                if cells and cells[-1].cell_type == 'markdown' and \
+                        sum(c.source == cells[-1].source for c in cells) > 1:
+                    cells.pop()
+                continue
+            seen.add(cell.source)
+        cells.append(cell)
+    removed = len(nb.cells) - len(cells)
+    nb.cells = cells
+    return removed
+
+
+def add_sections(nb, sections):
+    """Insert (markdown, code) cell pairs after their anchor cells, once"""
+    added = 0
+    for anchor, markdown, code in sections:
+        first_line = code.split('\n', 1)[0]
+        if any(cell.source.startswith(first_line) for cell in nb.cells):
+            continue
+        for i, cell in enumerate(nb.cells):
+            if cell.cell_type == 'code' and cell.source.startswith(anchor):
+                nb.cells[i + 1:i + 1] = [nbformat.v4.new_markdown_cell(markdown),
+                                         nbformat.v4.new_code_cell(code)]
+                added += 1
+                break
+    return added
+
+
+def update_notebook(notebook_path):
+    with open(notebook_path, 'r', encoding='utf-8') as f:
+        nb = nbformat.read(f, as_version=4)
+
+    replacements = REPLACEMENTS + NOTEBOOK_REPLACEMENTS.get(notebook_path, [])
+    changed = 0
+    emptied = []
+    for cell in nb.cells:
+        if cell.cell_type == 'markdown':
+            for old, new in MARKDOWN_REPLACEMENTS:
+                if old in cell.source:
+                    cell.source = cell.source.replace(old, new)
+                    changed += 1
+        if cell.cell_type != 'code':
+            continue
+        original = cell.source
+        for old, new in replacements:
+            if old in cell.source:
+                cell.source = cell.source.replace(old, new)
+                changed += 1
+        for name in PACKAGE_FUNCTIONS:
+            if f'def {name}(' in cell.source:
+                cell.source = remove_function_definition(cell.source, name)
+                changed += 1
+                if not cell.source.strip():
+                    emptied.append(cell)
+        if re.fullmatch(PLACEHOLDER_PATTERN, cell.source.strip()):
+            emptied.append(cell)
+        # Outputs of the old source would be stale
+        if cell.source != original:
+            clear_outputs(cell)
+
+    # Drop cells that only held a definition now imported from the package
+    if emptied:
+        nb.cells = [cell for cell in nb.cells if not any(cell is e for e in emptied)]
+        changed += len(emptied)
+
+    changed += add_sections(nb, NOTEBOOK_SECTIONS.get(notebook_path, []))
+    changed += remove_redundant_cells(nb)
+    changed += add_package_import(nb)
+
+    # Cell ids only exist from nbformat 4.5 on; new cells get one regardless
+    if nb.nbformat_minor < 5:
+        for cell in nb.cells:
+            cell.pop('id', None)
+
+    with open(notebook_path, 'w', encoding='utf-8') as f:
+        nbformat.write(nb, f)
+    return changed
+
+
+def main():
+    for nb_path in NOTEBOOKS:
+        try:
+            changed = update_notebook(nb_path)
+            print(f"Updated {nb_path}: {changed} replacement(s)")
+        except Exception as e:
+            print(f"Error updating {nb_path}: {e}")
+
+
+if __name__ == '__main__':
+    main()
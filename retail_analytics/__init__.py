@@ -0,0 +1,101 @@
+"""Shared data utilities for the Online Retail customer behaviour notebooks."""
+
+from .affinity import association_rules, basket_matrix, frequent_itemsets, product_affinity
+from .analyses import (
+    ANALYSES, descriptive_analysis, diagnostic_analysis, inventory_analysis, predictive_analysis
+)
+from .artifacts import add_time_features, load_clean_data, load_feature_store
+from .cleaning import (
+    CLEANING_RULES, build_clean_mask, cancelled_mask, clean_data, split_cancellations
+)
+from .clustering import SEGMENT_COLUMNS, elbow_k, kmeans_sweep, segment_customers
+from .cohorts import CohortTracker, cohort_matrices, month_codes
+from .dedup import StreamingDeduplicator, drop_duplicate_rows, duplicated_rows, row_hashes
+from .feature_store import CustomerFeatureStore
+from .features import FEATURE_COLUMNS, compute_customer_features, create_customer_features
+from .inventory import INVENTORY_COLUMNS, analyze_inventory
+from .loader import load_retail_data, file_hash
+from .models import (
+    METRIC_COLUMNS, default_model_zoo, make_predictions, train_model_zoo, train_prediction_models
+)
+from .moments import CorrelationAccumulator, streaming_corr
+from .preferences import preference_matrix, segment_preferences, segment_top_products
+from .pricing import daily_price_quantity, price_elasticity
+from .profiling import PROFILE_COLUMNS, CellProfiler, profile_cells
+from .registry import ModelRegistry, data_hash, feature_set_hash
+from .rfm import SEGMENT_RULES, quantile_scores, rfm_segments
+from .scoring import PREDICTION_COLUMNS, iter_customer_chunks, score_customers
+from .schema import TRANSACTION_SCHEMA, apply_schema, category_codes, memory_report
+from .service import ScoringService, serve
+from .streaming import iter_excel_batches, read_excel_streaming
+
+__all__ = [
+    'association_rules',
+    'basket_matrix',
+    'frequent_itemsets',
+    'product_affinity',
+    'ANALYSES',
+    'descriptive_analysis',
+    'diagnostic_analysis',
+    'inventory_analysis',
+    'predictive_analysis',
+    'add_time_features',
+    'load_clean_data',
+    'load_feature_store',
+    'CLEANING_RULES',
+    'build_clean_mask',
+    'cancelled_mask',
+    'clean_data',
+    'split_cancellations',
+    'SEGMENT_COLUMNS',
+    'elbow_k',
+    'kmeans_sweep',
+    'segment_customers',
+    'CohortTracker',
+    'cohort_matrices',
+    'month_codes',
+    'StreamingDeduplicator',
+    'drop_duplicate_rows',
+    'duplicated_rows',
+    'row_hashes',
+    'CustomerFeatureStore',
+    'FEATURE_COLUMNS',
+    'compute_customer_features',
+    'create_customer_features',
+    'INVENTORY_COLUMNS',
+    'analyze_inventory',
+    'load_retail_data',
+    'file_hash',
+    'METRIC_COLUMNS',
+    'default_model_zoo',
+    'make_predictions',
+    'train_model_zoo',
+    'train_prediction_models',
+    'CorrelationAccumulator',
+    'streaming_corr',
+    'preference_matrix',
+    'segment_preferences',
+    'segment_top_products',
+    'daily_price_quantity',
+    'price_elasticity',
+    'PROFILE_COLUMNS',
+    'CellProfiler',
+    'profile_cells',
+    'ModelRegistry',
+    'data_hash',
+    'feature_set_hash',
+    'SEGMENT_RULES',
+    'quantile_scores',
+    'rfm_segments',
+    'PREDICTION_COLUMNS',
+    'iter_customer_chunks',
+    'score_customers',
+    'ScoringService',
+    'serve',
+    'TRANSACTION_SCHEMA',
+    'apply_schema',
+    'category_codes',
+    'memory_report',
+    'iter_excel_batches',
+    'read_excel_streaming',
+]
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .schema import category_codes
+
+ITEMSET_COLUMNS = ['itemset', 'length', 'count', 'support']
+RULE_COLUMNS = ['antecedent', 'consequent', 'count', 'support', 'confidence', 'lift']
+
+
+def basket_matrix(df, invoice_col='InvoiceNo', item_col='StockCode'):
+    """
+    Binary invoice x item CSR matrix: 1 where the item appears on the invoice.
+
+    Built directly from the key columns' integer codes, so memory is one
+    entry per distinct (invoice, item) line. Returns (matrix, items).
+    """
+    invoice_codes, _ = pd.factorize(df[invoice_col])
+    item_codes, items = category_codes(df[item_col])
+    valid = (invoice_codes >= 0) & (item_codes >= 0)
+
+    matrix = sparse.csr_matrix(
+        (np.ones(int(valid.sum()), dtype=np.int32), (invoice_codes[valid], item_codes[valid])),
+        shape=(int(invoice_codes.max()) + 1 if valid.any() else 0, len(items)),
+    )
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    return matrix, pd.Index(items, name=item_col)
+
+
+def _chunks(weights, budget):
+    """Split range(len(weights)) into slices whose weights sum to about budget"""
+    bounds = np.searchsorted(np.cumsum(weights), np.arange(budget, weights.sum(), budget))
+    edges = np.unique(np.concatenate([[0], bounds + 1, [len(weights)]]))
+    return [slice(a, b) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+def _itemset_indicator(basket_items, members):
+    """Sparse baskets x itemsets matrix: 1 where the basket holds every member"""
+    indicator = basket_items[:, members[:, 0]]
+    for j in range(1, members.shape[1]):
+        indicator = indicator.multiply(basket_items[:, members[:, j]]).tocsc()
+    return indicator
+
+
+def frequent_itemsets(baskets, items, min_support=0.01, max_len=3, max_nnz=4_000_000):
+    """
+    Itemsets that appear in at least min_support of the baskets.
+
+    Mining is level-wise over the sparse basket matrix, FP-growth style:
+    items below the support threshold are dropped before anything else,
+    which shrinks the matrix to the frequent columns. For each level the
+    frequent k-itemsets are turned into a sparse baskets x itemsets
+    indicator (the product of their member columns), and the counts of
+    every (itemset, item) extension come from one sparse product with the
+    basket matrix. Only extensions by a larger item index are kept, so each
+    itemset is counted once. Itemsets are processed in chunks whose member
+    columns hold about max_nnz entries, which bounds memory regardless of
+    the number of candidates.
+
+    Returns a DataFrame with ITEMSET_COLUMNS, itemsets as tuples of labels.
+    """
+    n_baskets = baskets.shape[0]
+    min_count = max(1, int(np.ceil(min_support * n_baskets)))
+
+    item_counts = np.asarray(baskets.sum(axis=0)).ravel()
+    frequent = np.flatnonzero(item_counts >= min_count)
+    basket_items = baskets[:, frequent].tocsc().astype(np.float32)
+    frequent_counts = item_counts[frequent]
+
+    members = np.arange(len(frequent))[:, None]
+    levels = [(members, frequent_counts)]
+
+    for _ in range(2, max_len + 1):
+        if not len(members):
+            break
+        parents, extensions, counts = [], [], []
+        for chunk in _chunks(frequent_counts[members].sum(axis=1), max_nnz):
+            indicator = _itemset_indicator(basket_items, members[chunk])
+            # pair_counts[s, j] = number of baskets holding itemset s and item j
+            pair_counts = (indicator.T @ basket_items).tocoo()
+            keep = ((pair_counts.col > members[chunk][pair_counts.row, -1]) &
+                    (pair_counts.data >= min_count))
+            parents.append(pair_counts.row[keep] + chunk.start)
+            extensions.append(pair_counts.col[keep])
+            counts.append(pair_counts.data[keep])
+
+        parents, extensions = np.concatenate(parents), np.concatenate(extensions)
+        order = np.lexsort((extensions, parents))
+        members = np.column_stack([members[parents[order]], extensions[order]])
+        if len(members):
+            levels.append((members, np.concatenate(counts)[order]))
+
+    labels = items[frequent]
+    result = pd.DataFrame({
+        'itemset': [tuple(labels[m]) for level, _ in levels for m in level],
+        'length': np.concatenate([np.full(len(level), level.shape[1]) for level, _ in levels]),
+        'count': np.concatenate([c for _, c in levels]).astype(np.int64),
+    })
+    result['support'] = result['count'] / n_baskets
+    return result[ITEMSET_COLUMNS].sort_values(['length', 'count'], ascending=[True, False],
+                                               ignore_index=True)
+
+
+def association_rules(itemsets, n_baskets, min_confidence=0.2, min_lift=1.0):
+    """
+    Rules antecedent -> consequent from a frequent_itemsets() table.
+
+    Every itemset of two or more items yields one rule per member as the
+    consequent, with the remaining members as the antecedent.
+    confidence = support(itemset) / support(antecedent) and
+    lift = confidence / support(consequent). Rules below min_confidence or
+    min_lift are dropped. Returns a DataFrame with RULE_COLUMNS sorted by lift.
+    """
+    counts = dict(zip(itemsets['itemset'].map(frozenset), itemsets['count']))
+    rows = []
+    for itemset, count in zip(itemsets['itemset'], itemsets['count']):
+        if len(itemset) < 2:
+            continue
+        for consequent in itemset:
+            antecedent = tuple(item for item in itemset if item != consequent)
+            rows.append((antecedent, consequent, count,
+                         counts[frozenset(antecedent)], counts[frozenset((consequent,))]))
+
+    rules = pd.DataFrame(rows, columns=['antecedent', 'consequent', 'count',
+                                        'antecedent_count', 'consequent_count'])
+    rules['support'] = rules['count'] / n_baskets
+    rules['confidence'] = rules['count'] / rules['antecedent_count']
+    rules['lift'] = rules['confidence'] / (rules['consequent_count'] / n_baskets)
+    rules = rules[(rules['confidence'] >= min_confidence) & (rules['lift'] >= min_lift)]
+    return rules[RULE_COLUMNS].sort_values('lift', ascending=False, ignore_index=True)
+
+
+def product_affinity(df, invoice_col='InvoiceNo', item_col='StockCode', min_support=0.01,
+                     max_len=3, min_confidence=0.2, min_lift=1.0, max_nnz=4_000_000):
+    """Frequent itemsets and association rules for the invoice baskets in df"""
+    baskets, items = basket_matrix(df, invoice_col, item_col)
+    itemsets = frequent_itemsets(baskets, items, min_support, max_len, max_nnz)
+    rules = association_rules(itemsets, baskets.shape[0], min_confidence, min_lift)
+    return itemsets, rules
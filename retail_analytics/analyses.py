@@ -0,0 +1,110 @@
+from .affinity import product_affinity
+from .clustering import segment_customers
+from .cohorts import cohort_matrices
+from .features import create_customer_features
+from .inventory import analyze_inventory
+from .models import make_predictions, train_prediction_models
+from .moments import CorrelationAccumulator
+from .pricing import price_elasticity
+
+# Predictors of total_spent used by the predictive notebook
+PREDICTOR_COLUMNS = ['purchase_count', 'avg_order_value', 'unique_products', 'customer_lifetime']
+
+
+def descriptive_analysis(df_clean, top_n=10):
+    """Tables of the descriptive notebook: top products, monthly sales and customer spending"""
+    product_sales = df_clean.groupby('Description', observed=True).agg(
+        Quantity=('Quantity', 'sum'),
+        TotalAmount=('TotalAmount', 'sum'),
+        TransactionCount=('InvoiceNo', 'count'),
+    )
+    customer_spending = df_clean.groupby('CustomerID', observed=True).agg(
+        TotalSpent=('TotalAmount', 'sum'),
+        AverageTransactionValue=('TotalAmount', 'mean'),
+        TransactionCount=('TotalAmount', 'count'),
+        TotalItems=('Quantity', 'sum'),
+    ).round(2)
+    return {
+        'top_products_by_quantity': product_sales.nlargest(top_n, 'Quantity'),
+        'top_products_by_amount': product_sales.nlargest(top_n, 'TotalAmount'),
+        'monthly_sales': df_clean.groupby('Month')['TotalAmount'].sum().to_frame(),
+        'customer_spending': customer_spending.describe(),
+    }
+
+
+def diagnostic_analysis(df_clean, top_n=10):
+    """
+    Tables of the behaviour diagnostic notebook: spending correlations,
+    seasonal performance, price elasticity, cohort retention and product
+    affinity rules
+    """
+    customer_analysis = df_clean.groupby('CustomerID', observed=True).agg(
+        PurchaseFrequency=('InvoiceNo', 'count'),
+        TotalItems=('Quantity', 'sum'),
+        AvgItemsPerOrder=('Quantity', 'mean'),
+        TotalSpent=('TotalAmount', 'sum'),
+        AvgOrderValue=('TotalAmount', 'mean'),
+        ProductVariety=('Description', 'nunique'),
+    )
+    correlations = CorrelationAccumulator(customer_analysis.columns).update(customer_analysis).corr()
+
+    seasonal_revenue = df_clean.groupby(['Season', 'Month'], observed=True).agg(
+        TotalRevenue=('TotalAmount', 'sum'),
+        ItemsSold=('Quantity', 'sum'),
+        Transactions=('InvoiceNo', 'nunique'),
+        UniqueCustomers=('CustomerID', 'nunique'),
+    ).round(2)
+
+    elasticity = price_elasticity(df_clean, product_col='Description')
+    _, retention, _ = cohort_matrices(df_clean.dropna(subset=['CustomerID']))
+    _, rules = product_affinity(df_clean, invoice_col='InvoiceNo', item_col='StockCode')
+    product_names = df_clean.groupby('StockCode', observed=True)['Description'].first()
+    top_rules = rules.head(top_n).copy()
+    top_rules['antecedent'] = top_rules['antecedent'].map(
+        lambda codes: ' + '.join(str(product_names.get(code, code)) for code in codes))
+    top_rules['consequent'] = top_rules['consequent'].map(
+        lambda code: str(product_names.get(code, code)))
+
+    return {
+        'spending_correlations': correlations['TotalSpent'].sort_values(ascending=False).to_frame(),
+        'seasonal_revenue': seasonal_revenue,
+        'price_sensitive_products': elasticity.dropna(subset=['elasticity']).nsmallest(top_n, 'elasticity'),
+        'cohort_retention': (retention * 100).round(1),
+        'affinity_rules': top_rules.round(3),
+    }
+
+
+def predictive_analysis(df_clean, top_n=10, n_jobs=None, registry=None):
+    """
+    Tables of the predictive notebook: model metrics, the customers with
+    the highest predicted revenue and the KMeans customer segments
+    """
+    features = create_customer_features(df_clean)
+    fitted, scaler, results = train_prediction_models(
+        features, feature_columns=PREDICTOR_COLUMNS, n_jobs=n_jobs, registry=registry)
+    predictions = make_predictions(features, fitted['Random Forest'], scaler,
+                                   feature_columns=PREDICTOR_COLUMNS)
+    _, segments, k_curve = segment_customers(features, n_jobs=n_jobs)
+    return {
+        'model_results': results.round(3),
+        'top_predicted_customers': predictions.nlargest(top_n, 'Predicted_Revenue'),
+        'customer_segments': segments,
+        'k_curve': k_curve,
+    }
+
+
+def inventory_analysis(df_clean, top_n=10):
+    """Demand and reorder points of the most ordered and the highest-reorder products"""
+    demand = analyze_inventory(df_clean)
+    return {
+        'top_demand': demand.head(top_n),
+        'top_reorder_points': demand.nlargest(top_n, 'ReorderPoint'),
+    }
+
+
+ANALYSES = {
+    'descriptive': descriptive_analysis,
+    'diagnostic': diagnostic_analysis,
+    'predictive': predictive_analysis,
+    'inventory': inventory_analysis,
+}
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+from .cleaning import CLEANING_RULES, CLEANING_VERSION, clean_data
+from .feature_store import CustomerFeatureStore
+from .loader import (
+    DEFAULT_CACHE_DIR, DEFAULT_DATA_FILE, cache_path_for, file_hash,
+    load_retail_data, remove_stale_caches, write_parquet_atomic
+)
+
+SEASONS = {
+    1: 'Winter', 2: 'Winter', 3: 'Spring', 4: 'Spring',
+    5: 'Spring', 6: 'Summer', 7: 'Summer', 8: 'Summer',
+    9: 'Fall', 10: 'Fall', 11: 'Fall', 12: 'Winter'
+}
+
+DERIVED_COLUMNS = ['TotalAmount', 'Month', 'Season', 'DayOfWeek', 'Hour']
+
+
+def add_time_features(df):
+    """Add the Month, Season, DayOfWeek and Hour columns used by the notebooks"""
+    dates = df['InvoiceDate'].dt
+    df['Month'] = dates.month
+    df['Season'] = df['Month'].map(SEASONS)
+    df['DayOfWeek'] = dates.day_name()
+    df['Hour'] = dates.hour
+    return df
+
+
+def cleaning_key(raw_digest, drop_duplicates=False):
+    """Cache key combining the raw workbook hash and the cleaning rule set"""
+    params = {
+        'raw': raw_digest,
+        'rules': CLEANING_RULES,
+        'version': CLEANING_VERSION,
+        'drop_duplicates': drop_duplicates,
+        'derived': DERIVED_COLUMNS,
+    }
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+def load_clean_data(file_path=DEFAULT_DATA_FILE, cache_dir=DEFAULT_CACHE_DIR,
+                    drop_duplicates=False, refresh=False, verbose=True):
+    """
+    Load the cleaned transaction table with derived columns from the cache.
+
+    The artifact holds the clean_data output plus TotalAmount, Month, Season,
+    DayOfWeek and Hour. It is keyed by the workbook's content hash and the
+    cleaning parameters, so it is rebuilt only when either changes.
+    """
+    variant = 'dedup' if drop_duplicates else 'clean'
+    key = cleaning_key(file_hash(file_path), drop_duplicates)
+    cache_path = cache_path_for(file_path, key, cache_dir, variant)
+
+    if cache_path.exists() and not refresh:
+        if verbose:
+            print(f"Loading cleaned data from {cache_path}")
+        return pd.read_parquet(cache_path)
+
+    df = load_retail_data(file_path, cache_dir=cache_dir, verbose=verbose)
+    df_clean = add_time_features(clean_data(df, drop_duplicates=drop_duplicates,
+                                            verbose=verbose))
+
+    write_parquet_atomic(df_clean, cache_path)
+    remove_stale_caches(file_path, cache_path, cache_dir, variant)
+
+    if verbose:
+        print(f"Cached {len(df_clean):,} cleaned records to {cache_path}")
+    return df_clean
+
+
+def load_feature_store(file_path=DEFAULT_DATA_FILE, cache_dir=DEFAULT_CACHE_DIR, refresh=False,
+                       verbose=True):
+    """
+    Load the CustomerFeatureStore of the cleaned data from the cache.
+
+    The store is saved under the same key as the cleaned table, so it is
+    rebuilt from load_clean_data only when the workbook or the cleaning
+    rules change. Call features() on it for the compute_customer_features
+    columns.
+    """
+    key = cleaning_key(file_hash(file_path))
+    store_path = Path(cache_dir) / f"{Path(file_path).stem}-features-{key[:16]}"
+
+    # save() writes meta.json last, so its presence marks a complete store
+    if (store_path / 'meta.json').exists() and not refresh:
+        if verbose:
+            print(f"Loading customer feature store from {store_path}")
+        return CustomerFeatureStore.load(store_path)
+
+    store = CustomerFeatureStore.from_transactions(
+        load_clean_data(file_path, cache_dir=cache_dir, verbose=verbose))
+    store.save(store_path)
+    for old in Path(cache_dir).glob(f"{Path(file_path).stem}-features-*"):
+        if old != store_path:
+            shutil.rmtree(old)
+
+    if verbose:
+        print(f"Saved features of {len(store.state):,} customers to {store_path}")
+    return store
@@ -0,0 +1,118 @@
+import time
+import tracemalloc
+
+import pandas as pd
+
+from .cleaning import cancelled_mask, clean_data
+from .rfm import rfm_segments
+
+
+def measure(func, *args, repeat=3, **kwargs):
+    """
+    Run func several times and return its best wall time and peak memory.
+
+    Peak memory is the tracemalloc high-water mark of the first run, which
+    covers numpy and pandas buffers allocated during the call.
+    """
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        timings = [time.perf_counter() - start]
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        timings.append(time.perf_counter() - start)
+
+    return {
+        'wall_time_s': min(timings),
+        'peak_memory_mb': peak / 1024 ** 2,
+        'result': result,
+    }
+
+
+def chained_clean_data(df):
+    """The copy-per-step clean_data used in the notebooks, kept for comparison"""
+    df_clean = df.copy()
+    df_clean = df_clean.dropna()
+    df_clean = df_clean[~df_clean['InvoiceNo'].astype(str).str.contains('C')]
+    df_clean = df_clean[(df_clean['Quantity'] > 0) & (df_clean['UnitPrice'] > 0)]
+    df_clean['InvoiceDate'] = pd.to_datetime(df_clean['InvoiceDate'])
+    df_clean['TotalAmount'] = df_clean['Quantity'] * df_clean['UnitPrice']
+    return df_clean.reset_index(drop=True)
+
+
+def qcut_rfm_segments(customer_features):
+    """The qcut + apply(axis=1) RFM segmentation from the notebook fixer"""
+    rfm_scores = customer_features.copy()
+    for metric in ['Recency', 'Frequency', 'TotalRevenue']:
+        labels = range(5, 0, -1) if metric == 'Recency' else range(1, 6)
+        rfm_scores[f'{metric}_Score'] = pd.qcut(rfm_scores[metric], q=5, labels=labels)
+    rfm_scores['RFM_Score'] = (rfm_scores['Recency_Score'].astype(str) +
+                               rfm_scores['Frequency_Score'].astype(str) +
+                               rfm_scores['TotalRevenue_Score'].astype(str))
+
+    def segment_customers(row):
+        r, f, m = row['Recency_Score'], row['Frequency_Score'], row['TotalRevenue_Score']
+        if r >= 4 and f >= 4 and m >= 4:
+            return 'Champions'
+        elif r >= 3 and f >= 3 and m >= 3:
+            return 'Loyal Customers'
+        elif r >= 3 and f >= 1 and m >= 2:
+            return 'Potential Loyalists'
+        elif r <= 2 and f <= 2 and m <= 2:
+            return 'Lost Customers'
+        else:
+            return 'Average Customers'
+
+    rfm_scores['Customer_Segment'] = rfm_scores.apply(segment_customers, axis=1)
+    return rfm_scores
+
+
+def compare(candidates, *args, repeat=3):
+    """
+    Measure several implementations on the same input.
+
+    candidates maps a label to a callable. Returns a DataFrame with wall
+    time, peak memory and the speed-up relative to the first candidate.
+    """
+    rows = []
+    for label, func in candidates.items():
+        stats = measure(func, *args, repeat=repeat)
+        rows.append({
+            'implementation': label,
+            'wall_time_s': stats['wall_time_s'],
+            'peak_memory_mb': stats['peak_memory_mb'],
+        })
+
+    results = pd.DataFrame(rows).set_index('implementation')
+    results['speedup'] = results['wall_time_s'].iloc[0] / results['wall_time_s']
+    return results.round(4)
+
+
+def benchmark_cleaning(df, repeat=3):
+    """Compare the chained clean_data with the single-mask engine"""
+    return compare({
+        'chained': chained_clean_data,
+        'single_mask': lambda frame: clean_data(frame, verbose=False),
+    }, df, repeat=repeat)
+
+
+def benchmark_cancellations(df, repeat=3):
+    """Compare astype(str).str.contains with the per-invoice classifier"""
+    return compare({
+        'str_contains': lambda frame: frame['InvoiceNo'].astype(str).str.contains('C'),
+        'per_invoice': lambda frame: cancelled_mask(frame['InvoiceNo']),
+    }, df, repeat=repeat)
+
+
+def benchmark_rfm(customer_features, repeat=3):
+    """Compare qcut + apply(axis=1) RFM segmentation with the vectorized engine"""
+    return compare({
+        'qcut_apply': qcut_rfm_segments,
+        'vectorized': rfm_segments,
+    }, customer_features, repeat=repeat)
@@ -0,0 +1,301 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+import types
+import uuid
+from pathlib import Path
+
+import cloudpickle
+import nbformat
+import numpy as np
+import pandas as pd
+from nbclient import NotebookClient
+
+from .dataflow import cell_files, cell_names, has_magics
+from .loader import DEFAULT_CACHE_DIR, file_hash
+
+DEFAULT_CELL_CACHE_DIR = os.path.join(DEFAULT_CACHE_DIR, 'cells')
+
+CELL_COLUMNS = ['cell', 'status', 'seconds', 'writes', 'key']
+
+# File digests, keyed by (path, modification time, size)
+_file_digests = {}
+
+
+def _file_digest(path):
+    """SHA-256 of a file, memoised until its modification time or size changes"""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _file_digests:
+        _file_digests[key] = file_hash(path)
+    return _file_digests[key]
+
+
+def path_digest(path):
+    """
+    Digest of a cell input: the content hash of a file, a hash of the
+    names, sizes and modification times under a directory, or 'missing'
+    """
+    if os.path.isfile(path):
+        return _file_digest(path)
+    if os.path.isdir(path):
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                full = os.path.join(root, name)
+                stat = os.stat(full)
+                digest.update(f'{os.path.relpath(full, path)}:{stat.st_size}:{stat.st_mtime_ns}\n'.encode())
+        return digest.hexdigest()
+    return 'missing'
+
+
+def _module_digest(module_name):
+    """Digest of the file that defines a module, or of its name if it has none"""
+    module = sys.modules.get(module_name)
+    path = getattr(module, '__file__', None)
+    return _file_digest(path) if path and os.path.exists(path) else module_name
+
+
+def value_hash(value):
+    """
+    Content hash of a kernel value, or None if it cannot be hashed.
+
+    DataFrames, Series and indexes hash their labels, dtypes and
+    hash_pandas_object values; numeric arrays hash their bytes. Modules, and
+    functions or classes imported from a module, hash by name plus the
+    digest of the defining source file, so editing retail_analytics code
+    invalidates cells that call it. Everything else hashes its cloudpickle
+    bytes, which covers functions defined in the notebook by value.
+    """
+    try:
+        if isinstance(value, types.ModuleType):
+            return f'module:{value.__name__}:{_module_digest(value.__name__)}'
+        module_name = getattr(value, '__module__', None)
+        if (isinstance(value, (types.FunctionType, type)) and module_name
+                and module_name != '__main__'):
+            return f'ref:{module_name}.{value.__qualname__}:{_module_digest(module_name)}'
+
+        digest = hashlib.sha256(type(value).__name__.encode())
+        if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+            if isinstance(value, pd.DataFrame):
+                digest.update(repr((list(value.columns), list(value.dtypes.astype(str)))).encode())
+            else:
+                digest.update(repr((value.name, str(value.dtype))).encode())
+            hashed = pd.util.hash_pandas_object(value, index=not isinstance(value, pd.Index))
+            digest.update(hashed.to_numpy().tobytes())
+        elif isinstance(value, np.ndarray) and value.dtype != object:
+            digest.update(f'{value.shape}{value.dtype}'.encode())
+            digest.update(np.ascontiguousarray(value).tobytes())
+        else:
+            digest.update(cloudpickle.dumps(value))
+        return digest.hexdigest()
+    except Exception:
+        return None
+
+
+def _user_namespace():
+    return get_ipython().user_ns  # noqa: F821 - only called inside a kernel
+
+
+def _parquet_safe(value):
+    """True for DataFrames whose labels survive a Parquet round trip"""
+    return (isinstance(value, pd.DataFrame) and not isinstance(value.columns, pd.MultiIndex)
+            and all(isinstance(c, str) for c in value.columns))
+
+
+def kernel_hashes(names):
+    """Kernel side: print the value hash of each name ('undefined' when unbound)"""
+    ns = _user_namespace()
+    print(json.dumps({name: value_hash(ns[name]) if name in ns else 'undefined'
+                      for name in names}))
+
+
+def kernel_save(directory, names):
+    """
+    Kernel side: store the named values in directory (DataFrames as Parquet,
+    everything else in one cloudpickle file) and print whether it worked.
+    Cells that bind modules are setup cells and are never stored, since
+    restoring them would skip their side effects (styles, warning filters).
+    """
+    ns = _user_namespace()
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    stored = {'parquet': [], 'pickle': [], 'absent': []}
+    pickled = {}
+    try:
+        for name in names:
+            if name not in ns:
+                stored['absent'].append(name)
+                continue
+            value = ns[name]
+            if isinstance(value, types.ModuleType):
+                raise TypeError(f"{name} is a module")
+            if _parquet_safe(value):
+                try:
+                    value.to_parquet(directory / f'{name}.parquet')
+                    stored['parquet'].append(name)
+                    continue
+                except Exception:
+                    pass
+            pickled[name] = value
+        with open(directory / 'values.pkl', 'wb') as f:
+            cloudpickle.dump(pickled, f)
+        stored['pickle'] = sorted(pickled)
+        with open(directory / 'values.json', 'w', encoding='utf-8') as f:
+            json.dump(stored, f)
+        print(json.dumps({'saved': True}))
+    except Exception as e:
+        print(json.dumps({'saved': False, 'error': f'{type(e).__name__}: {e}'}))
+
+
+def kernel_load(directory, names=None):
+    """Kernel side: restore values stored by kernel_save (all, or only names) into the namespace"""
+    ns = _user_namespace()
+    directory = Path(directory)
+    with open(directory / 'values.json', encoding='utf-8') as f:
+        stored = json.load(f)
+
+    def wanted(name):
+        return names is None or name in names
+
+    for name in filter(wanted, stored['parquet']):
+        ns[name] = pd.read_parquet(directory / f'{name}.parquet')
+    if any(map(wanted, stored['pickle'])):
+        with open(directory / 'values.pkl', 'rb') as f:
+            ns.update({name: value for name, value in cloudpickle.load(f).items() if wanted(name)})
+    for name in filter(wanted, stored['absent']):
+        ns.pop(name, None)
+    print(json.dumps({'loaded': True}))
+
+
+def kernel_call(client, function, *args):
+    """Run a kernel-side helper of this module without touching the history"""
+    code = (f"__import__('retail_analytics.cellcache', fromlist=['{function}'])"
+            f".{function}(*{args!r})")
+    cell = nbformat.v4.new_code_cell(code)
+    # nbclient stores the executed cell back at its index, so use a slot past the end
+    client.nb.cells.append(cell)
+    try:
+        client.execute_cell(cell, len(client.nb.cells) - 1, store_history=False)
+    finally:
+        client.nb.cells.pop()
+    text = ''.join(o.get('text', '') for o in cell.outputs if o.output_type == 'stream')
+    return json.loads(text.strip().splitlines()[-1])
+
+
+def cell_key(source, upstream_hashes, file_digests=None):
+    """Cache key of a cell: its source plus the hashes of the values and files it reads"""
+    payload = json.dumps({'source': source, 'upstream': upstream_hashes,
+                          'files': file_digests or {}}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def run_cached(notebook_path, output_path=None, cache_dir=DEFAULT_CELL_CACHE_DIR,
+               cell_timeout=600, kernel_name='python3', verbose=True):
+    """
+    Execute a notebook, reusing cached cells whose inputs have not changed.
+
+    Each code cell is keyed by its source and the hashes of the upstream
+    values it reads (found with dataflow.cell_names) and the digests of the
+    files it reads (dataflow.cell_files, e.g. the workbook behind
+    load_clean_data or the model registry). On a hit the stored
+    outputs are put back in the notebook and the values the cell wrote are
+    loaded into the kernel, so the cell is not run. On a miss the cell runs
+    and its outputs and written values are stored under the key. A cell
+    writes the names it binds plus any read value whose hash changed while
+    it ran (in-place mutation). Editing a cell therefore re-runs that cell
+    and every later cell whose inputs change as a result, and nothing else.
+    Cells that use magics or bind modules, cannot be analysed, read a file
+    whose path is not a literal or hold values that cannot be pickled
+    always run. Side effects such as written files are not replayed for
+    cached cells.
+
+    The executed notebook is written to output_path (default: in place).
+    Returns a DataFrame with CELL_COLUMNS, one row per code cell.
+    """
+    notebook_path = Path(notebook_path)
+    cache_dir = Path(cache_dir).resolve()
+    notebook_dir = notebook_path.parent.resolve()
+    with open(notebook_path, 'r', encoding='utf-8') as f:
+        nb = nbformat.read(f, as_version=4)
+
+    client = NotebookClient(nb, timeout=cell_timeout, kernel_name=kernel_name,
+                            resources={'metadata': {'path': str(notebook_path.parent.resolve())}})
+    hashes = {}
+    report = []
+    with client.setup_kernel():
+        for index, cell in enumerate(nb.cells):
+            if cell.cell_type != 'code' or not cell.source.strip():
+                continue
+            start = time.perf_counter()
+            try:
+                defines, uses = cell_names(cell.source)
+                paths, files_known = cell_files(cell.source)
+            except SyntaxError:
+                defines = uses = None
+
+            if defines is None or has_magics(cell.source):
+                # Magics may change kernel state, and unparsable cells have
+                # unknown reads and writes: run them and forget every known hash
+                client.execute_cell(cell, index)
+                hashes.clear()
+                seconds = time.perf_counter() - start
+                report.append((index, 'uncached', seconds, None, None))
+                if verbose:
+                    print(f"[{index}] uncached in {seconds:.2f}s")
+                continue
+
+            unknown = [name for name in uses if name not in hashes]
+            if unknown:
+                hashes.update(kernel_call(client, 'kernel_hashes', unknown))
+            files = {path: path_digest(notebook_dir / path) for path in paths}
+            key = cell_key(cell.source, {name: hashes[name] for name in uses}, files)
+            entry = cache_dir / key[:32]
+
+            meta = None
+            # A value or file that cannot be hashed could change unnoticed, so never reuse then
+            if (files_known and (entry / 'meta.json').exists()
+                    and all(hashes[name] is not None for name in uses)):
+                with open(entry / 'meta.json', encoding='utf-8') as f:
+                    meta = json.load(f)
+
+            if meta is not None and meta['cacheable']:
+                kernel_call(client, 'kernel_load', str(entry))
+                cell.outputs = [nbformat.from_dict(output) for output in meta['outputs']]
+                cell.execution_count = None
+                hashes.update(meta['hashes'])
+                status, writes = 'cached', meta['writes']
+            else:
+                client.execute_cell(cell, index)
+                after = kernel_call(client, 'kernel_hashes', sorted(set(defines) | set(uses)))
+                writes = sorted(set(defines) | {name for name in uses
+                                                if after[name] != hashes.get(name)})
+                hashes.update(after)
+
+                tmp_entry = cache_dir / f'.{entry.name}-{uuid.uuid4().hex[:8]}.tmp'
+                saved = kernel_call(client, 'kernel_save', str(tmp_entry), writes)
+                cacheable = (files_known and saved['saved']
+                             and all(after[name] is not None for name in writes))
+                meta = {'source': cell.source, 'writes': writes,
+                        'hashes': {name: after[name] for name in writes},
+                        'outputs': cell.outputs, 'cacheable': cacheable}
+                with open(tmp_entry / 'meta.json', 'w', encoding='utf-8') as f:
+                    json.dump(meta, f)
+                if entry.exists():
+                    shutil.rmtree(entry)
+                os.replace(tmp_entry, entry)
+                status = 'executed' if cacheable else 'uncached'
+
+            seconds = time.perf_counter() - start
+            report.append((index, status, seconds, writes, key[:12]))
+            if verbose:
+                print(f"[{index}] {status} in {seconds:.2f}s")
+
+    output_path = Path(output_path) if output_path is not None else notebook_path
+    with open(output_path, 'w', encoding='utf-8') as f:
+        nbformat.write(nb, f)
+    return pd.DataFrame(report, columns=CELL_COLUMNS)
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+from .dedup import duplicated_rows
+
+# Bump when a rule's behaviour changes so cached cleaned datasets rebuild
+CLEANING_VERSION = 1
+
+# Rules in the order the notebooks historically applied them. A row dropped
+# by an earlier rule is not counted again by later ones.
+CLEANING_RULES = [
+    'missing_values',
+    'duplicates',
+    'cancelled',
+    'non_positive_quantity',
+    'non_positive_price',
+]
+
+
+def _missing_mask(df):
+    """True where any column of the row is missing"""
+    missing = np.zeros(len(df), dtype=bool)
+    for col in df.columns:
+        missing |= df[col].isna().to_numpy()
+    return missing
+
+
+def cancelled_mask(invoice_no):
+    """
+    True for cancelled invoices (InvoiceNo containing 'C').
+
+    The check runs once per distinct invoice number and is broadcast back to
+    the rows through integer codes: the categorical codes when InvoiceNo is
+    dictionary encoded, otherwise the codes from pd.factorize. Purely numeric
+    invoice columns cannot contain cancellations and return all False, and
+    pandas string columns use their native vectorized search.
+    """
+    if pd.api.types.is_numeric_dtype(invoice_no.dtype):
+        return np.zeros(len(invoice_no), dtype=bool)
+    if isinstance(invoice_no.dtype, pd.StringDtype):
+        return invoice_no.str.contains('C', regex=False, na=False).to_numpy(dtype=bool)
+
+    if isinstance(invoice_no.dtype, pd.CategoricalDtype):
+        codes = invoice_no.cat.codes.to_numpy()
+        uniques = invoice_no.cat.categories
+    else:
+        codes, uniques = pd.factorize(invoice_no)
+
+    is_cancelled = pd.Index(uniques).astype(str).str.contains('C', regex=False)
+    # Append False for the -1 code that marks missing values
+    lookup = np.append(np.asarray(is_cancelled, dtype=bool), False)
+    return lookup[codes]
+
+
+def split_cancellations(df):
+    """
+    Split transactions into (orders, cancellations).
+
+    The cancellations frame holds the rows of cancelled invoices, for
+    example for return analysis; orders holds everything else.
+    """
+    cancelled = cancelled_mask(df['InvoiceNo'])
+    orders = df.loc[~cancelled].reset_index(drop=True)
+    cancellations = df.loc[cancelled].reset_index(drop=True)
+    return orders, cancellations
+
+
+def rule_masks(df, drop_duplicates=False):
+    """
+    Evaluate every cleaning rule against the raw frame.
+
+    Returns a dict of rule name -> boolean array that is True for rows the
+    rule rejects. Nothing is copied or filtered here.
+    """
+    masks = {
+        'missing_values': _missing_mask(df),
+        'cancelled': cancelled_mask(df['InvoiceNo']),
+        'non_positive_quantity': ~(df['Quantity'].to_numpy(dtype=float, na_value=np.nan) > 0),
+        'non_positive_price': ~(df['UnitPrice'].to_numpy(dtype=float, na_value=np.nan) > 0),
+    }
+    if drop_duplicates:
+        masks['duplicates'] = duplicated_rows(df)
+    return {rule: masks[rule] for rule in CLEANING_RULES if rule in masks}
+
+
+def build_clean_mask(df, drop_duplicates=False):
+    """
+    Combine all rules into one keep-mask in a single pass.
+
+    Returns (keep, report) where report lists, for each rule, how many rows
+    fail it and how many it removed after the earlier rules were applied.
+    """
+    keep = np.ones(len(df), dtype=bool)
+    rows = []
+    for rule, rejected in rule_masks(df, drop_duplicates).items():
+        dropped = int(np.count_nonzero(rejected & keep))
+        keep &= ~rejected
+        rows.append({
+            'rule': rule,
+            'failing_rows': int(np.count_nonzero(rejected)),
+            'dropped': dropped,
+            'remaining': int(np.count_nonzero(keep)),
+        })
+    return keep, pd.DataFrame(rows, columns=['rule', 'failing_rows', 'dropped', 'remaining'])
+
+
+def clean_data(df, drop_duplicates=False, verbose=True, return_report=False):
+    """
+    Clean the retail dataset by:
+    1. Removing missing values
+    2. Removing duplicate rows (when drop_duplicates is True)
+    3. Removing cancelled orders (those with 'C' in InvoiceNo)
+    4. Ensuring positive quantities and prices
+    5. Converting InvoiceDate to datetime and adding TotalAmount
+
+    All rules are evaluated into one boolean mask that is applied once, so
+    the raw frame is copied a single time however many rules there are.
+    """
+    if df is None:
+        return (None, None) if return_report else None
+
+    keep, report = build_clean_mask(df, drop_duplicates)
+    df_clean = df.loc[keep].reset_index(drop=True)
+    for col in df_clean.columns:
+        if isinstance(df_clean[col].dtype, pd.CategoricalDtype):
+            df_clean[col] = df_clean[col].cat.remove_unused_categories()
+
+    if not pd.api.types.is_datetime64_any_dtype(df_clean['InvoiceDate']):
+        df_clean['InvoiceDate'] = pd.to_datetime(df_clean['InvoiceDate'])
+    df_clean['TotalAmount'] = df_clean['Quantity'] * df_clean['UnitPrice']
+
+    if verbose:
+        print("Data cleaning summary:")
+        print(f"Original records: {len(df)}")
+        for row in report.itertuples():
+            print(f"  {row.rule}: removed {row.dropped}")
+        print(f"Clean records: {len(df_clean)}")
+        print(f"Removed records: {len(df) - len(df_clean)}")
+
+    if return_report:
+        return df_clean, report
+    return df_clean
@@ -0,0 +1,74 @@
+import argparse
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from .analyses import ANALYSES
+from .artifacts import load_clean_data
+from .loader import DEFAULT_DATA_FILE
+from .registry import DEFAULT_REGISTRY_DIR, ModelRegistry
+
+
+def run_analyses(names, data_file=DEFAULT_DATA_FILE, output_dir=None, top_n=10, n_jobs=None,
+                 registry_dir=DEFAULT_REGISTRY_DIR, verbose=True):
+    """
+    Run analyses from ANALYSES in plain Python, without a kernel.
+
+    The cleaned data is loaded once from the Parquet cache and shared.
+    Every table is printed and, with output_dir, written there as
+    <analysis>_<table>.csv. Returns {analysis: {table: DataFrame}}.
+    """
+    df_clean = load_clean_data(data_file, verbose=verbose)
+    output_dir = Path(output_dir) if output_dir is not None else None
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    results = {}
+    for name in names:
+        start = time.perf_counter()
+        if name == 'predictive':
+            registry = ModelRegistry(registry_dir) if registry_dir else None
+            tables = ANALYSES[name](df_clean, top_n=top_n, n_jobs=n_jobs, registry=registry)
+        else:
+            tables = ANALYSES[name](df_clean, top_n=top_n)
+        results[name] = tables
+
+        for table_name, table in tables.items():
+            if output_dir is not None:
+                table.to_csv(output_dir / f'{name}_{table_name}.csv')
+            if verbose:
+                print(f"\n{name} / {table_name}:")
+                with pd.option_context('display.max_columns', None, 'display.width', 120):
+                    print(table.head(top_n))
+        if verbose:
+            print(f"\n{name} analysis finished in {time.perf_counter() - start:.1f}s")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='retail-analytics',
+                                     description="Online Retail customer behaviour analyses")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help="Run analyses without a Jupyter kernel")
+    run.add_argument('analyses', nargs='+', choices=list(ANALYSES) + ['all'])
+    run.add_argument('--data', default=DEFAULT_DATA_FILE, help="Online Retail workbook")
+    run.add_argument('--output-dir', help="Write every table here as CSV")
+    run.add_argument('--top', type=int, default=10, help="Rows per ranked table")
+    run.add_argument('--n-jobs', type=int, help="Worker processes for model and k sweeps")
+    run.add_argument('--registry', default=DEFAULT_REGISTRY_DIR,
+                     help="Model registry directory ('' to always retrain)")
+    commands.add_parser('list', help="List the available analyses")
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for name, function in ANALYSES.items():
+            print(f"{name:12s} {' '.join(function.__doc__.split())}")
+        return
+
+    names = list(ANALYSES) if 'all' in args.analyses else list(dict.fromkeys(args.analyses))
+    run_analyses(names, args.data, args.output_dir, args.top, args.n_jobs, args.registry)
+
+
+if __name__ == '__main__':
+    main()
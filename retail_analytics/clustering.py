@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+from sklearn.preprocessing import StandardScaler
+
+from .parallel import resolve_n_jobs, shared_array_pool, worker_arrays
+
+# Customer features the predictive notebook segments on
+SEGMENT_COLUMNS = ['total_spent', 'purchase_count', 'avg_order_value']
+
+# KMeans restarts per k, shared by the sweep and the final segmentation fit
+KMEANS_N_INIT = 10
+
+
+def _fit_k(k, params, features=None):
+    """Fit one k and return its inertia and subsampled silhouette"""
+    X = worker_arrays()['features'] if features is None else features
+    random_state = params['random_state']
+    if params['mini_batch']:
+        model = MiniBatchKMeans(n_clusters=k, random_state=random_state,
+                                batch_size=params['batch_size'], n_init=3)
+    else:
+        model = KMeans(n_clusters=k, random_state=random_state, n_init=KMEANS_N_INIT)
+    labels = model.fit_predict(X)
+
+    silhouette = np.nan
+    if 1 < k < len(X):
+        sample = params['sample']
+        sample_labels = labels if sample is None else labels[sample]
+        if len(np.unique(sample_labels)) > 1:
+            silhouette = silhouette_score(X if sample is None else X[sample], sample_labels)
+    return {'k': k, 'inertia': float(model.inertia_), 'silhouette': float(silhouette)}
+
+
+def elbow_k(k_values, inertias):
+    """
+    Elbow of an inertia curve: the k farthest below the straight line
+    joining the curve's first and last points, after scaling both axes to 0-1.
+    """
+    k_values = np.asarray(k_values, dtype=np.float64)
+    inertias = np.asarray(inertias, dtype=np.float64)
+    if len(k_values) < 3:
+        return int(k_values[-1])
+    x = (k_values - k_values[0]) / (k_values[-1] - k_values[0])
+    span = inertias[0] - inertias[-1]
+    y = (inertias - inertias[-1]) / span if span > 0 else np.zeros_like(inertias)
+    return int(k_values[np.argmax((1 - x) - y)])
+
+
+def kmeans_sweep(features, k_values=range(1, 11), n_jobs=None, mini_batch=False,
+                 batch_size=1024, sample_size=5000, min_improvement=None,
+                 method='elbow', random_state=42):
+    """
+    Fit KMeans for several k concurrently and pick the number of clusters.
+
+    Each k is fitted in its own worker process of a shared_array_pool, which
+    maps one read-only copy of the feature matrix into every worker.
+
+    mini_batch=True uses MiniBatchKMeans. Silhouette scores are computed on
+    a fixed random subsample of sample_size rows. With min_improvement set,
+    the sweep stops at the last k whose extra cluster lowered inertia by at
+    least that fraction: the k that fell short is left out of the curve and
+    pending k values are cancelled. method chooses k from the 'elbow' of the
+    inertia curve or the best 'silhouette'.
+
+    Returns (best_k, curve) where curve is a DataFrame indexed by k with
+    inertia and silhouette columns.
+    """
+    X = np.ascontiguousarray(features, dtype=np.float64)
+    k_values = [k for k in k_values if 1 <= k <= len(X)]
+    if not k_values:
+        raise ValueError("No candidate k between 1 and the number of rows")
+
+    rng = np.random.default_rng(random_state)
+    sample = None
+    if sample_size is not None and len(X) > sample_size:
+        sample = np.sort(rng.choice(len(X), size=sample_size, replace=False))
+    params = {'mini_batch': mini_batch, 'batch_size': batch_size,
+              'sample': sample, 'random_state': random_state}
+
+    n_jobs = resolve_n_jobs(n_jobs, len(k_values))
+    results = []
+
+    def keep_going(result):
+        if min_improvement is not None and results:
+            previous, current = results[-1]['inertia'], result['inertia']
+            if previous > 0 and (previous - current) / previous < min_improvement:
+                return False
+        results.append(result)
+        return True
+
+    if n_jobs == 1:
+        for k in k_values:
+            if not keep_going(_fit_k(k, params, X)):
+                break
+    else:
+        with shared_array_pool({'features': X}, n_jobs) as pool:
+            futures = [pool.submit(_fit_k, k, params) for k in k_values]
+            # Results are consumed in k order so early stopping sees the curve in sequence
+            for i, future in enumerate(futures):
+                if not keep_going(future.result()):
+                    for pending in futures[i + 1:]:
+                        pending.cancel()
+                    break
+
+    curve = pd.DataFrame(results).set_index('k')
+    if method == 'silhouette' and curve['silhouette'].notna().any():
+        best_k = int(curve['silhouette'].idxmax())
+    else:
+        best_k = elbow_k(curve.index, curve['inertia'])
+    return best_k, curve
+
+
+def segment_customers(features, columns=SEGMENT_COLUMNS, k_values=range(1, 11), n_jobs=None,
+                      random_state=42):
+    """
+    Cluster customers with KMeans at the elbow of a k sweep.
+
+    The columns are standardised, kmeans_sweep picks k, and KMeans is
+    refitted at that k with the sweep's n_init and random_state, so the
+    labels come from the same fit the sweep scored. Returns (segmented,
+    summary, curve): a copy of features with a Cluster column, the size and
+    mean of each column (plus unique_products when present) per cluster,
+    and the sweep curve.
+    """
+    X = StandardScaler().fit_transform(features[list(columns)].to_numpy(dtype=np.float64))
+    best_k, curve = kmeans_sweep(X, k_values=k_values, n_jobs=n_jobs, random_state=random_state)
+    labels = KMeans(n_clusters=best_k, random_state=random_state,
+                    n_init=KMEANS_N_INIT).fit_predict(X)
+    segmented = features.assign(Cluster=labels)
+
+    profile = list(columns) + [c for c in ['unique_products'] if c in features and c not in columns]
+    groups = segmented.groupby('Cluster')
+    summary = groups[profile].mean().rename(
+        columns=lambda c: c if c.startswith('avg_') else f'avg_{c}')
+    summary.insert(1, 'customer_count', groups.size())
+    return segmented, summary.round(2), curve
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+
+def month_codes(dates):
+    """Integer month index (months since 1970-01) of each timestamp"""
+    return pd.to_datetime(dates).to_numpy().astype('datetime64[M]').view(np.int64)
+
+
+class CohortTracker:
+    """
+    First-purchase-month x months-since-first-purchase cohort matrices.
+
+    active[c, k] counts the customers of cohort c (first purchase in month
+    base + c) who bought in month k after their first, and revenue[c, k]
+    sums what they spent then. A batch of transactions is binned with integer
+    month codes and one bincount per matrix. Only cells of the months in the
+    batch change, so adding a new month touches just the new diagonal of
+    the matrices and leaves the history alone.
+
+    Batches must cover whole months that are later than every month already
+    added, since active customers are counted once per (customer, month).
+    """
+
+    def __init__(self):
+        self.first_month = pd.Series(dtype=np.int64, index=pd.Index([], name='CustomerID'))
+        self.base_month = None
+        self.last_month = None
+        self.active = np.zeros((0, 0), dtype=np.int64)
+        self.revenue = np.zeros((0, 0), dtype=np.float64)
+
+    def _grow(self, n_months):
+        """Pad the matrices to n_months x n_months"""
+        extra = n_months - self.active.shape[0]
+        if extra > 0:
+            self.active = np.pad(self.active, ((0, extra), (0, extra)))
+            self.revenue = np.pad(self.revenue, ((0, extra), (0, extra)))
+
+    def update(self, batch):
+        """Add transactions from months after the last month already added"""
+        batch = batch.dropna(subset=['CustomerID'])
+        if not len(batch):
+            return self
+        months = month_codes(batch['InvoiceDate'])
+        if self.last_month is not None and months.min() <= self.last_month:
+            raise ValueError(
+                f"Cohort batches must be newer than {np.datetime64(self.last_month, 'M')}; "
+                "rebuild the tracker to change earlier months")
+
+        if 'TotalAmount' in batch.columns:
+            amount = batch['TotalAmount'].to_numpy(dtype=np.float64)
+        else:
+            amount = (batch['Quantity'].to_numpy(dtype=np.float64) *
+                      batch['UnitPrice'].to_numpy(dtype=np.float64))
+
+        codes, customers = pd.factorize(batch['CustomerID'])
+        batch_first = np.full(len(customers), np.iinfo(np.int64).max)
+        np.minimum.at(batch_first, codes, months)
+
+        position = self.first_month.index.get_indexer(customers)
+        known = position >= 0
+        first = batch_first.copy()
+        first[known] = self.first_month.to_numpy()[position[known]]
+        new_customers = pd.Series(batch_first[~known], index=customers[~known])
+        if len(self.first_month):
+            self.first_month = pd.concat([self.first_month, new_customers])
+        else:
+            self.first_month = new_customers.rename_axis('CustomerID')
+
+        if self.base_month is None:
+            self.base_month = int(months.min())
+        self.last_month = int(months.max())
+        n_months = self.last_month - self.base_month + 1
+        self._grow(n_months)
+
+        row_first = first[codes]
+        cells = (row_first - self.base_month) * n_months + (months - row_first)
+        self.revenue += np.bincount(cells, weights=amount,
+                                    minlength=n_months * n_months).reshape(n_months, n_months)
+
+        # Each customer counts once per month: keep the first row of every
+        # (customer, month) pair, found by sorting one combined key
+        month_offset = months - months.min()
+        keys = codes.astype(np.int64) * (int(month_offset.max()) + 1) + month_offset
+        order = np.argsort(keys, kind='stable')
+        first_of_pair = np.ones(len(keys), dtype=bool)
+        first_of_pair[1:] = keys[order][1:] != keys[order][:-1]
+        self.active += np.bincount(cells[order][first_of_pair],
+                                   minlength=n_months * n_months).reshape(n_months, n_months)
+        return self
+
+    def matrices(self):
+        """
+        (active, retention, revenue) DataFrames indexed by cohort month with
+        one column per month since first purchase. Retention is active
+        customers over cohort size; cells after the last month are NaN and
+        months in which no customer made a first purchase are left out.
+        """
+        n_months = self.active.shape[0]
+        if n_months == 0:
+            empty = pd.DataFrame()
+            return empty, empty, empty
+        cohorts = pd.period_range(start=pd.Period(np.datetime64(self.base_month, 'M'), 'M'),
+                                  periods=n_months, freq='M', name='cohort')
+        offsets = pd.RangeIndex(n_months, name='months_since_first_purchase')
+
+        observed = np.add.outer(np.arange(n_months), np.arange(n_months)) < n_months
+        sizes = self.active[:, 0].astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            retention = np.where(observed, self.active / sizes[:, None], np.nan)
+
+        active = pd.DataFrame(np.where(observed, self.active, np.nan), index=cohorts, columns=offsets)
+        revenue = pd.DataFrame(np.where(observed, self.revenue, np.nan), index=cohorts, columns=offsets)
+        retention = pd.DataFrame(retention, index=cohorts, columns=offsets)
+        has_customers = sizes > 0
+        return active[has_customers], retention[has_customers], revenue[has_customers]
+
+
+def cohort_matrices(df):
+    """(active, retention, revenue) cohort matrices for a transaction table"""
+    return CohortTracker().update(df).matrices()
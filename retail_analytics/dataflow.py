@@ -0,0 +1,319 @@
+import ast
+import builtins
+import re
+import symtable
+
+from IPython.core.inputtransformer2 import TransformerManager
+
+from .loader import DEFAULT_DATA_FILE
+from .registry import DEFAULT_REGISTRY_DIR
+
+# Names that are always available in a kernel and never come from another cell
+KERNEL_NAMES = set(dir(builtins)) | {'get_ipython', 'display', 'In', 'Out', '_', '__', '___'}
+
+# Methods that change their receiver in place (list.append, dict.update, set.add, ...)
+MUTATING_METHODS = {'append', 'extend', 'insert', 'remove', 'pop', 'popitem', 'clear', 'sort',
+                    'reverse', 'update', 'setdefault', 'add', 'discard'}
+
+# Magics whose argument or body is ordinary Python run in the user namespace
+PYTHON_MAGICS = {'time', 'timeit', 'prun', 'capture'}
+
+_line_magic = re.compile(r'^(\s*)%(?:time|timeit|prun)\s+(?:-\w+(?:\s+\d+)?\s+)*(.*)$')
+_cell_magic = re.compile(r'^%%(\w+)(.*)$')
+
+# Calls that read files: name -> (path used when none is passed, position of the path argument)
+FILE_FUNCTIONS = {
+    'open': (None, 0),
+    'read_csv': (None, 0),
+    'read_excel': (None, 0),
+    'read_json': (None, 0),
+    'read_parquet': (None, 0),
+    'read_pickle': (None, 0),
+    'load_retail_data': (DEFAULT_DATA_FILE, 0),
+    'load_clean_data': (DEFAULT_DATA_FILE, 0),
+    'load_feature_store': (DEFAULT_DATA_FILE, 0),
+    'iter_excel_batches': (DEFAULT_DATA_FILE, 0),
+    'read_excel_streaming': (DEFAULT_DATA_FILE, 0),
+    'ModelRegistry': (DEFAULT_REGISTRY_DIR, 0),
+    'make_predictions': (DEFAULT_REGISTRY_DIR, None),
+}
+
+PATH_KEYWORDS = {'file_path', 'file', 'path', 'root', 'io', 'filepath_or_buffer'}
+
+# Prefix of the pseudo-names that order cells reading the same file
+FILE_PREFIX = '<file:'
+
+# try/except* blocks only exist from Python 3.11 on
+TRY_STATEMENTS = (ast.Try, getattr(ast, 'TryStar', ast.Try))
+
+_transformer = TransformerManager()
+
+
+def _unwrap_magics(source):
+    """
+    Replace %%time/%%timeit/%%prun/%%capture cells and %time/%timeit/%prun
+    lines by the Python they run; %%capture out also binds out
+    """
+    lines = source.lstrip('\n').splitlines()
+    match = _cell_magic.match(lines[0]) if lines else None
+    if match and match.group(1) in PYTHON_MAGICS:
+        lines = lines[1:]
+        args = [a for a in match.group(2).split() if not a.startswith('-')]
+        if match.group(1) == 'capture' and args:
+            lines.insert(0, f'{args[0]} = None')
+    return '\n'.join(_line_magic.sub(r'\1\2', line) for line in lines)
+
+
+def python_source(source):
+    """Cell source with IPython magics and shell escapes turned into plain Python"""
+    return _transformer.transform_cell(_unwrap_magics(source))
+
+
+def has_magics(source):
+    """True if a cell uses IPython magics or shell escapes"""
+    return _transformer.transform_cell(source).rstrip() != source.rstrip()
+
+
+def _scope_globals(table):
+    """Global names referenced anywhere inside a function, class or comprehension scope"""
+    names = set()
+    for symbol in table.get_symbols():
+        if symbol.is_referenced() and (symbol.is_global() or symbol.is_free()):
+            names.add(symbol.get_name())
+    for child in table.get_children():
+        names |= _scope_globals(child)
+    return names
+
+
+def _base_name(node):
+    """Name at the root of a subscript or attribute chain (df for df['x'].iloc), or None"""
+    while isinstance(node, (ast.Subscript, ast.Attribute)):
+        node = node.value
+    return node.id if isinstance(node, ast.Name) else None
+
+
+def _mutated_names(statement):
+    """
+    Names a statement changes in place: assigning or deleting an item or
+    attribute (df['x'] = ...), calling a mutating method (items.append(x))
+    or passing inplace=True (df.dropna(inplace=True))
+    """
+    targets = []
+    names = set()
+    for node in ast.walk(statement):
+        if isinstance(node, (ast.Assign, ast.Delete)):
+            targets.extend(node.targets)
+        elif isinstance(node, (ast.AugAssign, ast.AnnAssign)):
+            targets.append(node.target)
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            inplace = any(k.arg == 'inplace' and isinstance(k.value, ast.Constant) and k.value.value
+                          for k in node.keywords)
+            if inplace or node.func.attr in MUTATING_METHODS:
+                base = _base_name(node.func.value)
+                if base is not None:
+                    names.add(base)
+    for target in targets:
+        for node in ast.walk(target):
+            if isinstance(node, (ast.Subscript, ast.Attribute)) and isinstance(node.ctx, (ast.Store, ast.Del)):
+                base = _base_name(node.value)
+                if base is not None:
+                    names.add(base)
+    return names
+
+
+def statement_names(statement):
+    """(defines, uses) of one top-level statement"""
+    table = symtable.symtable(ast.unparse(statement), '<cell>', 'exec')
+    defines, uses = set(), set()
+    for symbol in table.get_symbols():
+        name = symbol.get_name()
+        if symbol.is_assigned() or symbol.is_imported():
+            defines.add(name)
+        if symbol.is_referenced():
+            uses.add(name)
+    for child in table.get_children():
+        uses |= _scope_globals(child)
+    mutated = _mutated_names(statement)
+    return defines | mutated, uses | mutated
+
+
+def _target_names(target):
+    """(defines, uses) of binding to a for-loop or with-statement target"""
+    return statement_names(ast.Assign(targets=[target], value=ast.Constant(None), lineno=0))
+
+
+def _block_names(statements, defines, uses):
+    """
+    Accumulate the defines and upstream uses of a statement list in order,
+    descending into compound statements that do not open a new scope
+    """
+    def add(names):
+        statement_defines, statement_uses = names
+        uses.update(statement_uses - defines)
+        defines.update(statement_defines)
+
+    def expression(node):
+        add(statement_names(ast.Expr(node)))
+
+    for statement in statements:
+        if isinstance(statement, TRY_STATEMENTS):
+            _block_names(statement.body, defines, uses)
+            for handler in statement.handlers:
+                if handler.type is not None:
+                    expression(handler.type)
+                if handler.name:
+                    defines.add(handler.name)
+                _block_names(handler.body, defines, uses)
+            _block_names(statement.orelse, defines, uses)
+            _block_names(statement.finalbody, defines, uses)
+        elif isinstance(statement, (ast.If, ast.While)):
+            expression(statement.test)
+            _block_names(statement.body, defines, uses)
+            _block_names(statement.orelse, defines, uses)
+        elif isinstance(statement, (ast.For, ast.AsyncFor)):
+            expression(statement.iter)
+            add(_target_names(statement.target))
+            _block_names(statement.body, defines, uses)
+            _block_names(statement.orelse, defines, uses)
+        elif isinstance(statement, (ast.With, ast.AsyncWith)):
+            for item in statement.items:
+                expression(item.context_expr)
+                if item.optional_vars is not None:
+                    add(_target_names(item.optional_vars))
+            _block_names(statement.body, defines, uses)
+        else:
+            add(statement_names(statement))
+
+
+def cell_names(source):
+    """
+    Names a code cell defines and the names it uses from earlier cells.
+
+    Magics are first rewritten to Python: the code under %time, %timeit,
+    %prun and %%capture is analysed as if written directly, and any other
+    magic by IPython's input transformer. Statements are analysed in order
+    with symtable, descending into try/if/for/while/with blocks, so names
+    read inside function bodies, lambdas and comprehensions count as uses
+    while a name read only after the cell itself has bound it does not.
+    Changing a value in place (df['Month'] = ..., df.dropna(inplace=True),
+    items.append(x)) both uses and defines it. Builtins and kernel names
+    are ignored.
+
+    Returns (defines, uses) as sorted lists. Raises SyntaxError for cells
+    that are not valid Python even after the magic rewrite.
+    """
+    defines, uses = set(), set()
+    _block_names(ast.parse(python_source(source)).body, defines, uses)
+    return sorted(defines), sorted(uses - KERNEL_NAMES)
+
+
+def is_setup_cell(source, setup_names=()):
+    """
+    True for cells that import modules or use magics and read nothing but
+    setup_names, the names bound by earlier setup cells
+    """
+    if not has_magics(source) and not any(isinstance(node, (ast.Import, ast.ImportFrom))
+                                          for node in ast.walk(ast.parse(python_source(source)))):
+        return False
+    return set(cell_names(source)[1]) <= set(setup_names)
+
+
+def cell_dag(sources):
+    """
+    Dependency graph of a notebook's code cells.
+
+    sources maps cell index to source, in notebook order. Setup cells
+    (imports, magics) are separated out, since they must run first in any
+    kernel. Every other cell depends, for each name it uses, on the last
+    earlier non-setup cell that defined or changed that name; names only
+    bound by setup cells add no edge. Because each edge names the version
+    of the value a cell reads, cells with no path between them can run in
+    any order or at the same time.
+
+    Cells that read the same file or directory (see cell_files) are also
+    kept in notebook order through a pseudo-name '<file:path>', so that a
+    cell loading models from the registry runs after the cell that trains
+    them. A cell reading a path that is only known at run time is ordered
+    after every earlier file access, and every later one after it.
+
+    Returns (setup, inputs): the list of setup cell indices, and a dict
+    mapping each other cell to {name: producing cell index}.
+    """
+    setup, inputs = [], {}
+    setup_names = set()
+    last_writer = {}
+    for index, source in sources.items():
+        defines, uses = cell_names(source)
+        if is_setup_cell(source, setup_names):
+            setup.append(index)
+            setup_names.update(defines)
+            continue
+        paths, complete = cell_files(source)
+        if complete:
+            files = [FILE_PREFIX + path + '>' for path in paths]
+            uses = uses + files + [FILE_PREFIX + '?>']
+        else:
+            files = [FILE_PREFIX + '?>']
+            uses = uses + [name for name in last_writer if name.startswith(FILE_PREFIX)]
+        defines = defines + files
+        inputs[index] = {name: last_writer[name] for name in uses if name in last_writer}
+        last_writer.update(dict.fromkeys(defines, index))
+    return setup, inputs
+
+
+def upstream(inputs, cell):
+    """Set of cells a cell depends on, directly or transitively"""
+    found, stack = set(), [cell]
+    while stack:
+        for producer in inputs[stack.pop()].values():
+            if producer not in found:
+                found.add(producer)
+                stack.append(producer)
+    return found
+
+
+def downstream(inputs, cells):
+    """
+    Minimal set of cells to re-run after cells change: the cells themselves
+    plus every cell that depends on them, directly or transitively
+    """
+    stale = set(cells)
+    for index in sorted(inputs):
+        if any(producer in stale for producer in inputs[index].values()):
+            stale.add(index)
+    return stale
+
+
+def cell_files(source):
+    """
+    Files and directories a cell reads through FILE_FUNCTIONS.
+
+    Returns (paths, complete): the sorted literal or default paths, and
+    False when some call passes its path as an expression, so the file
+    cannot be known before the cell runs.
+    """
+    paths, complete = set(), True
+    for node in ast.walk(ast.parse(python_source(source))):
+        if not isinstance(node, ast.Call):
+            continue
+        func = node.func
+        name = func.id if isinstance(func, ast.Name) else getattr(func, 'attr', None)
+        if name not in FILE_FUNCTIONS:
+            continue
+        default, position = FILE_FUNCTIONS[name]
+        argument = None
+        if position is not None:
+            if len(node.args) > position:
+                argument = node.args[position]
+            else:
+                argument = next((k.value for k in node.keywords if k.arg in PATH_KEYWORDS), None)
+        if argument is None:
+            if default is None:
+                complete = False
+            else:
+                paths.add(default)
+        elif isinstance(argument, ast.Constant) and isinstance(argument.value, str):
+            paths.add(argument.value)
+        else:
+            complete = False
+    return sorted(paths), complete
@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+
+# Hash given to missing values, which factorize codes as -1
+_MISSING_HASH = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _column_keys(series):
+    """
+    (hash, key) arrays for one column.
+
+    hash is a 64-bit hash of each row's value; key is an integer array that
+    is equal for two rows exactly when their values are equal (missing
+    values count as equal, as in df.duplicated). Plain numeric and datetime
+    columns are hashed directly from their bits; numbers are hashed as
+    float64 whatever their dtype, so 3 and 3.0 hash alike in batches that
+    typed a column differently. Strings and other objects are factorized
+    first so only the distinct values are hashed.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biufmM':
+        values = series.to_numpy()
+        if dtype.kind in 'mM':
+            key = values.view(np.int64)
+            return pd.util.hash_array(key), key
+        # Canonical NaN and +0.0 so equal values share one bit pattern
+        floats = values.astype(np.float64)
+        floats = np.where(np.isnan(floats), np.nan, floats + 0.0)
+        key = floats.view(np.int64) if dtype.kind == 'f' else values.astype(np.int64)
+        return pd.util.hash_array(floats.view(np.int64)), key
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series)
+    unique_hashes = pd.util.hash_pandas_object(pd.Series(uniques), index=False).to_numpy()
+    return np.append(unique_hashes, _MISSING_HASH)[codes], codes
+
+
+def value_hashes(series):
+    """64-bit hash of each value in a column, stable across frames and batches"""
+    return _column_keys(series)[0]
+
+
+def _combine_hashes(hashes):
+    """Mix per-column hashes into one row hash (same scheme as pandas)"""
+    mult = np.uint64(1000003)
+    out = np.full(len(hashes[0]), 0x345678, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for i, h in enumerate(hashes):
+            inverse = len(hashes) - i
+            out ^= h
+            out *= mult
+            mult += np.uint64(82520 + inverse + inverse)
+        out += np.uint64(97531)
+    return out
+
+
+def _row_keys(df):
+    """(row hashes, per-column comparison keys) for a frame"""
+    codes = []
+    hashes = []
+    for col in df.columns:
+        col_hash, col_key = _column_keys(df[col])
+        hashes.append(col_hash)
+        codes.append(col_key)
+    if not hashes:
+        return np.zeros(len(df), dtype=np.uint64), codes
+    return _combine_hashes(hashes), codes
+
+
+def row_hashes(df, columns=None):
+    """
+    64-bit fingerprint of every row, computed in vectorized form.
+
+    Numeric columns are hashed from their bits; string columns are
+    factorized so they cost one hash per distinct value rather than per row.
+    The hash of a value does not depend on the frame it came from, so
+    fingerprints from different batches can be compared.
+    """
+    if columns is not None:
+        df = df[columns]
+    return _row_keys(df)[0]
+
+
+def duplicated_rows(df, columns=None, keep='first', verify=True):
+    """
+    Boolean array marking duplicate rows, like df.duplicated().
+
+    Rows are compared by their 64-bit hash. With verify=True each row
+    flagged as a duplicate is checked exactly against the row kept for its
+    hash, by comparing per-column integer keys. Any hash group with
+    a mismatch (a real collision) falls back to df.duplicated on that group
+    alone.
+    """
+    if columns is not None:
+        df = df[columns]
+    hashes, codes = _row_keys(df)
+    return _duplicated_by_hash(df, hashes, codes, keep, verify)
+
+
+def _duplicated_by_hash(df, hashes, codes, keep='first', verify=True):
+    """duplicated_rows for a frame whose row keys are already known"""
+    # factorize numbers hashes in order of first appearance, so a row is the
+    # first with its hash exactly when its code exceeds every earlier code
+    hash_codes, uniques = pd.factorize(hashes)
+    if keep == 'first':
+        seen_max = np.maximum.accumulate(hash_codes)
+        duplicated = np.empty(len(hashes), dtype=bool)
+        duplicated[:1] = False
+        duplicated[1:] = hash_codes[1:] <= seen_max[:-1]
+        reference = np.flatnonzero(~duplicated)
+    else:
+        duplicated = pd.Series(hash_codes).duplicated(keep=keep).to_numpy(copy=True)
+        kept = pd.Series(hash_codes).drop_duplicates(keep='last' if keep == 'last' else 'first')
+        reference = np.empty(len(uniques), dtype=np.int64)
+        reference[kept.to_numpy()] = kept.index.to_numpy()
+
+    if not verify or not duplicated.any():
+        return duplicated
+
+    # Flagged rows must match the row kept for their hash in every column
+    candidates = np.flatnonzero(duplicated)
+    targets = reference[hash_codes[candidates]]
+    matches = np.ones(len(candidates), dtype=bool)
+    for col_codes in codes:
+        matches &= col_codes[candidates] == col_codes[targets]
+    if matches.all():
+        return duplicated
+
+    for code in np.unique(hash_codes[candidates[~matches]]):
+        group = np.flatnonzero(hash_codes == code)
+        duplicated[group] = df.iloc[group].duplicated(keep=keep).to_numpy()
+    return duplicated
+
+
+def drop_duplicate_rows(df, columns=None, verify=True):
+    """Return df without duplicate rows, keeping the first occurrence"""
+    return df.loc[~duplicated_rows(df, columns, verify=verify)]
+
+
+class StreamingDeduplicator:
+    """
+    Remove duplicate rows across a stream of DataFrame batches.
+
+    Only the 64-bit hashes of rows already seen are kept, as one sorted
+    uint64 array, so memory grows by 8 bytes per distinct row rather than
+    with the rows themselves. Within a batch duplicates are verified
+    exactly; rows from earlier batches are gone by the time later batches
+    arrive, so cross-batch matches are decided on the hash alone.
+    """
+
+    def __init__(self, columns=None):
+        self.columns = columns
+        self.seen = np.empty(0, dtype=np.uint64)
+        self.rows_in = 0
+        self.rows_dropped = 0
+
+    def _seen_before(self, hashes):
+        if not len(self.seen):
+            return np.zeros(len(hashes), dtype=bool)
+        pos = np.searchsorted(self.seen, hashes)
+        pos[pos == len(self.seen)] = 0
+        return self.seen[pos] == hashes
+
+    def filter(self, batch):
+        """Return the rows of batch that have not been seen before"""
+        rows = batch if self.columns is None else batch[self.columns]
+        hashes, codes = _row_keys(rows)
+        duplicated = _duplicated_by_hash(rows, hashes, codes)
+        duplicated |= self._seen_before(hashes)
+
+        self.seen = np.union1d(self.seen, hashes[~duplicated])
+        self.rows_in += len(batch)
+        self.rows_dropped += int(duplicated.sum())
+        return batch.loc[~duplicated]
@@ -0,0 +1,230 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .dedup import value_hashes
+from .features import FEATURE_COLUMNS, NS_PER_DAY
+from .loader import write_parquet_atomic
+
+# Size of each distinct-count sketch: the k smallest value hashes seen per
+# customer. Counts are exact up to k distinct values and estimated with
+# about 1/sqrt(k) relative error beyond that
+SKETCH_SIZE = 128
+_EMPTY = np.iinfo(np.uint64).max
+
+# Distinct counts kept as sketches: invoices, products (Description), months
+SKETCHED_FEATURES = ['invoice_count', 'unique_products', 'active_months']
+
+SUM_COLUMNS = ['purchase_count', 'sum_amount', 'sumsq_amount', 'sum_quantity', 'sumsq_quantity']
+STATE_COLUMNS = SUM_COLUMNS + ['first_ns', 'last_ns']
+
+
+def _bottom_k(codes, hashes, n_groups, k=SKETCH_SIZE):
+    """(n_groups, k) array of the k smallest distinct hashes per group"""
+    order = np.lexsort((hashes, codes))
+    codes, hashes = codes[order], hashes[order]
+    distinct = np.ones(len(codes), dtype=bool)
+    distinct[1:] = (codes[1:] != codes[:-1]) | (hashes[1:] != hashes[:-1])
+    codes, hashes = codes[distinct], hashes[distinct]
+
+    counts = np.bincount(codes, minlength=n_groups)
+    rank = np.arange(len(codes)) - (np.cumsum(counts) - counts)[codes]
+    keep = rank < k
+    sketch = np.full((n_groups, k), _EMPTY, dtype=np.uint64)
+    sketch[codes[keep], rank[keep]] = hashes[keep]
+    return sketch
+
+
+def merge_sketches(left, right):
+    """Union of two bottom-k sketch arrays of the same shape"""
+    k = left.shape[-1]
+    combined = np.sort(np.concatenate([left, right], axis=-1), axis=-1)
+    repeated = np.zeros(combined.shape, dtype=bool)
+    repeated[..., 1:] = combined[..., 1:] == combined[..., :-1]
+    combined[repeated] = _EMPTY
+    return np.sort(combined, axis=-1)[..., :k]
+
+
+def estimate_distinct(sketches):
+    """Distinct-count estimate for each bottom-k sketch (last axis)"""
+    k = sketches.shape[-1]
+    filled = np.count_nonzero(sketches != _EMPTY, axis=-1)
+    # A full sketch's k-th smallest hash, as a fraction of the hash range,
+    # estimates k / distinct count
+    kth = sketches[..., -1].astype(np.float64) / 2.0 ** 64
+    with np.errstate(divide='ignore'):
+        estimate = (k - 1) / kth
+    return np.where(filled < k, filled, estimate)
+
+
+def _aggregate_batch(batch):
+    """Per-customer running aggregates and sketches for one batch"""
+    batch = batch.dropna(subset=['CustomerID'])
+    codes, customers = pd.factorize(batch['CustomerID'])
+    n = len(customers)
+
+    quantity = batch['Quantity'].to_numpy(dtype=np.float64)
+    if 'TotalAmount' in batch.columns:
+        amount = batch['TotalAmount'].to_numpy(dtype=np.float64)
+    else:
+        amount = quantity * batch['UnitPrice'].to_numpy(dtype=np.float64)
+    date_ns = pd.to_datetime(batch['InvoiceDate']).to_numpy().astype('datetime64[ns]').view(np.int64)
+
+    first_ns = np.full(n, np.iinfo(np.int64).max, dtype=np.int64)
+    last_ns = np.full(n, np.iinfo(np.int64).min, dtype=np.int64)
+    np.minimum.at(first_ns, codes, date_ns)
+    np.maximum.at(last_ns, codes, date_ns)
+
+    state = pd.DataFrame({
+        'purchase_count': np.bincount(codes, minlength=n).astype(np.float64),
+        'sum_amount': np.bincount(codes, weights=amount, minlength=n),
+        'sumsq_amount': np.bincount(codes, weights=amount * amount, minlength=n),
+        'sum_quantity': np.bincount(codes, weights=quantity, minlength=n),
+        'sumsq_quantity': np.bincount(codes, weights=quantity * quantity, minlength=n),
+        'first_ns': first_ns,
+        'last_ns': last_ns,
+    }, index=pd.Index(customers, name='CustomerID'))
+
+    months = pd.Series(pd.to_datetime(batch['InvoiceDate']).to_numpy()
+                       .astype('datetime64[M]').view(np.int64))
+    sketched = [batch['InvoiceNo'], batch['Description'], months]
+    sketches = np.stack([_bottom_k(codes, value_hashes(values), n) for values in sketched], axis=1)
+    return state, sketches
+
+
+class CustomerFeatureStore:
+    """
+    Mergeable per-customer aggregates that can be updated batch by batch.
+
+    For every CustomerID the store keeps line counts, sums and sums of
+    squares of spend and quantity, first and last purchase times, and
+    bottom-k sketches of the distinct invoices, products and months seen.
+    All of these merge by addition, min/max or sketch union, so applying a batch of new
+    invoices only aggregates the batch and touches the customers in it.
+    """
+
+    def __init__(self):
+        self.state = pd.DataFrame(
+            {col: pd.Series(dtype=np.float64 if col in SUM_COLUMNS else np.int64)
+             for col in STATE_COLUMNS},
+            index=pd.Index([], name='CustomerID'))
+        self.sketches = np.full((0, len(SKETCHED_FEATURES), SKETCH_SIZE), _EMPTY, dtype=np.uint64)
+        self.rows_applied = 0
+
+    @classmethod
+    def from_transactions(cls, df):
+        """Build a store from a full (cleaned) transaction table"""
+        store = cls()
+        store.update(df)
+        return store
+
+    def _merge(self, state, sketches):
+        """Merge per-customer aggregates into the store"""
+        position = self.state.index.get_indexer(state.index)
+        known = position >= 0
+
+        if known.any():
+            rows = position[known]
+            current = self.state.iloc[rows]
+            incoming = state.loc[known]
+            merged = current[SUM_COLUMNS].to_numpy() + incoming[SUM_COLUMNS].to_numpy()
+            self.state.iloc[rows, [self.state.columns.get_loc(c) for c in SUM_COLUMNS]] = merged
+            self.state.iloc[rows, self.state.columns.get_loc('first_ns')] = np.minimum(
+                current['first_ns'].to_numpy(), incoming['first_ns'].to_numpy())
+            self.state.iloc[rows, self.state.columns.get_loc('last_ns')] = np.maximum(
+                current['last_ns'].to_numpy(), incoming['last_ns'].to_numpy())
+            self.sketches[rows] = merge_sketches(self.sketches[rows], sketches[known])
+
+        if not len(self.state):
+            self.state, self.sketches = state.copy(), sketches.copy()
+        elif not known.all():
+            self.state = pd.concat([self.state, state.loc[~known]])
+            self.sketches = np.concatenate([self.sketches, sketches[~known]])
+
+    def update(self, batch):
+        """Apply a batch of new (cleaned) transactions"""
+        if batch is None or not len(batch):
+            return self
+        state, sketches = _aggregate_batch(batch)
+        self._merge(state, sketches)
+        self.rows_applied += len(batch)
+        return self
+
+    def merge(self, other):
+        """Fold another store, e.g. built on another partition, into this one"""
+        self._merge(other.state, other.sketches)
+        self.rows_applied += other.rows_applied
+        return self
+
+    def features(self, as_of=None):
+        """
+        Customer features derived from the running aggregates.
+
+        Columns match compute_customer_features, plus standard deviations
+        from the sums of squares. invoice_count, unique_products and
+        active_months are exact up to SKETCH_SIZE distinct values per customer
+        and estimates above that.
+        """
+        s = self.state
+        count = s['purchase_count'].to_numpy()
+        first_ns = s['first_ns'].to_numpy()
+        last_ns = s['last_ns'].to_numpy()
+        if as_of is None:
+            as_of_ns = int(last_ns.max()) if len(last_ns) else 0
+        else:
+            as_of_ns = int(np.datetime64(pd.Timestamp(as_of), 'ns').astype(np.int64))
+
+        def sample_std(total, total_sq):
+            with np.errstate(invalid='ignore', divide='ignore'):
+                var = (total_sq - total * total / count) / (count - 1)
+            return np.sqrt(np.clip(var, 0, None))
+
+        distinct = np.rint(estimate_distinct(self.sketches)).astype(np.int64)
+        distinct = distinct.reshape(len(s), len(SKETCHED_FEATURES))
+
+        features = pd.DataFrame({
+            'first_purchase': first_ns.view('datetime64[ns]'),
+            'last_purchase': last_ns.view('datetime64[ns]'),
+            'customer_lifetime': (last_ns - first_ns) // NS_PER_DAY,
+            'recency_days': (as_of_ns - last_ns) // NS_PER_DAY,
+            'purchase_count': count.astype(np.int64),
+            'total_spent': s['sum_amount'].to_numpy(),
+            'avg_order_value': s['sum_amount'].to_numpy() / count,
+            'std_order_value': sample_std(s['sum_amount'].to_numpy(), s['sumsq_amount'].to_numpy()),
+            'total_items': s['sum_quantity'].to_numpy(),
+            'avg_items_per_order': s['sum_quantity'].to_numpy() / count,
+            'std_items': sample_std(s['sum_quantity'].to_numpy(), s['sumsq_quantity'].to_numpy()),
+        }, index=s.index)
+        for i, name in enumerate(SKETCHED_FEATURES):
+            features[name] = distinct[:, i]
+        return features[FEATURE_COLUMNS + ['std_order_value', 'std_items']]
+
+    def save(self, path):
+        """Persist the store to a directory"""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        write_parquet_atomic(self.state.reset_index(), path / 'state.parquet')
+        tmp_path = path / 'sketches.npy.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, self.sketches)
+        os.replace(tmp_path, path / 'sketches.npy')
+        with open(path / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump({'rows_applied': self.rows_applied,
+                       'sketch_size': SKETCH_SIZE}, f)
+
+    @classmethod
+    def load(cls, path):
+        """Load a store saved with save()"""
+        path = Path(path)
+        store = cls()
+        store.state = pd.read_parquet(path / 'state.parquet').set_index('CustomerID')
+        store.sketches = np.load(path / 'sketches.npy')
+        with open(path / 'meta.json', 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('sketch_size') != SKETCH_SIZE:
+            raise ValueError("Feature store was saved with a different sketch size")
+        store.rows_applied = meta['rows_applied']
+        return store
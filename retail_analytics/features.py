@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+NS_PER_DAY = 86400 * 10 ** 9
+
+FEATURE_COLUMNS = [
+    'first_purchase', 'last_purchase', 'customer_lifetime', 'recency_days',
+    'purchase_count', 'invoice_count', 'total_spent', 'avg_order_value',
+    'total_items', 'avg_items_per_order', 'unique_products', 'active_months'
+]
+
+# Layout of create_customer_features in the predictive notebook
+PREDICTIVE_FEATURES = [
+    'customer_lifetime', 'purchase_count', 'total_spent', 'avg_order_value',
+    'total_items', 'avg_items_per_order', 'unique_products'
+]
+
+
+def _distinct_per_group(group_codes, value_codes, n_groups):
+    """Number of distinct value codes within each group, by sorting one int64 key"""
+    valid = value_codes >= 0
+    width = int(value_codes.max()) + 1 if valid.any() else 1
+    keys = np.sort(group_codes[valid].astype(np.int64) * width + value_codes[valid])
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = keys[1:] != keys[:-1]
+    return np.bincount(keys[first] // width, minlength=n_groups)
+
+
+def compute_customer_features(df, as_of=None):
+    """
+    Compute every per-customer aggregate in one vectorized pass.
+
+    Rows are sorted once by customer code and each metric is a segment
+    reduction (np.add/minimum/maximum.reduceat) over that order, so there
+    are no per-group Python calls. Distinct products, invoices and months
+    are counted by sorting a combined (customer, value) integer key.
+    Recency is measured from as_of, defaulting to the latest InvoiceDate.
+
+    Returns a DataFrame indexed by CustomerID with FEATURE_COLUMNS.
+    """
+    customer_codes, customers = pd.factorize(df['CustomerID'], sort=True)
+    has_customer = customer_codes >= 0
+    if not has_customer.all():
+        df = df.loc[has_customer]
+        customer_codes = customer_codes[has_customer]
+    n = len(customers)
+
+    order = np.argsort(customer_codes, kind='stable')
+    counts = np.bincount(customer_codes, minlength=n)
+    starts = np.cumsum(counts) - counts
+
+    dates = pd.to_datetime(df['InvoiceDate']).to_numpy().astype('datetime64[ns]')
+    date_ns = dates.view(np.int64)[order]
+    quantity = df['Quantity'].to_numpy()
+    if quantity.dtype.kind not in 'iuf':
+        quantity = quantity.astype(np.float64)
+    quantity = quantity[order]
+    if 'TotalAmount' in df.columns:
+        amount = df['TotalAmount'].to_numpy(dtype=np.float64)[order]
+    else:
+        amount = quantity * df['UnitPrice'].to_numpy(dtype=np.float64)[order]
+
+    first_ns = np.minimum.reduceat(date_ns, starts) if n else date_ns[:0]
+    last_ns = np.maximum.reduceat(date_ns, starts) if n else date_ns[:0]
+    total_spent = np.add.reduceat(amount, starts) if n else amount[:0]
+    total_items = np.add.reduceat(quantity, starts) if n else quantity[:0]
+
+    if as_of is None:
+        as_of_ns = int(date_ns.max()) if len(date_ns) else 0
+    else:
+        as_of_ns = int(np.datetime64(pd.Timestamp(as_of), 'ns').astype(np.int64))
+
+    month_index = dates.astype('datetime64[M]').view(np.int64)
+    month_codes = month_index - month_index.min() if len(month_index) else month_index
+
+    features = pd.DataFrame({
+        'first_purchase': first_ns.view('datetime64[ns]'),
+        'last_purchase': last_ns.view('datetime64[ns]'),
+        'customer_lifetime': (last_ns - first_ns) // NS_PER_DAY,
+        'recency_days': (as_of_ns - last_ns) // NS_PER_DAY,
+        'purchase_count': counts,
+        'invoice_count': _distinct_per_group(
+            customer_codes, pd.factorize(df['InvoiceNo'])[0], n),
+        'total_spent': total_spent,
+        'avg_order_value': total_spent / counts,
+        'total_items': total_items,
+        'avg_items_per_order': total_items / counts,
+        'unique_products': _distinct_per_group(
+            customer_codes, pd.factorize(df['Description'])[0], n),
+        'active_months': _distinct_per_group(customer_codes, month_codes, n),
+    }, index=pd.Index(customers, name='CustomerID'))
+    return features[FEATURE_COLUMNS]
+
+
+def create_customer_features(df):
+    """
+    Create customer-level features for prediction.
+
+    df is either a transaction table or a CustomerFeatureStore, in which
+    case the features come from its running aggregates.
+    """
+    if df is None:
+        return None
+
+    if isinstance(df, pd.DataFrame):
+        customer_features = compute_customer_features(df)
+    else:
+        customer_features = df.features()
+    customer_features = customer_features[PREDICTIVE_FEATURES].copy()
+
+    # Calculate additional features
+    customer_features['purchase_frequency'] = (
+        customer_features['purchase_count'] / customer_features['customer_lifetime']
+    )
+    customer_features['avg_basket_size'] = (
+        customer_features['total_spent'] / customer_features['purchase_count']
+    )
+
+    # Handle infinite values
+    customer_features = customer_features.replace([np.inf, -np.inf], np.nan)
+    return customer_features.fillna(0)
@@ -0,0 +1,263 @@
+import argparse
+import copy
+import hashlib
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import nbformat
+import pandas as pd
+from nbclient import NotebookClient
+
+from .cellcache import kernel_call, path_digest
+from .dataflow import FILE_PREFIX, cell_dag, cell_files, cell_names, downstream
+from .loader import DEFAULT_CACHE_DIR
+
+DEFAULT_DATAFLOW_CACHE_DIR = os.path.join(DEFAULT_CACHE_DIR, 'dataflow')
+
+PLAN_COLUMNS = ['cell', 'status', 'depends_on', 'seconds', 'worker']
+
+PACKAGE_DIR = Path(__file__).resolve().parent
+
+
+def _digest(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def _package_digest():
+    """Digest of the retail_analytics sources, so editing the package invalidates every cell"""
+    digest = hashlib.sha256()
+    for path in sorted(PACKAGE_DIR.glob('*.py')):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def cell_keys(sources, setup, inputs, root='.'):
+    """
+    Cache keys of the setup cells and of every other cell.
+
+    A cell's key covers its source, the setup key, the keys of the cells
+    it reads from and the digests of the existing files it reads
+    (directories such as the model registry are ordered by cell_dag
+    instead, since cells write to them). Changing a cell or replacing the
+    workbook changes the key of everything downstream and nothing else.
+    Paths are relative to root. Returns (setup_key, keys).
+    """
+    setup_key = _digest({'package': _package_digest(),
+                         'setup': [sources[index] for index in setup]})
+    keys = {}
+    for index, producers in inputs.items():
+        files = {path: path_digest(Path(root) / path) for path in cell_files(sources[index])[0]
+                 if (Path(root) / path).is_file()}
+        keys[index] = _digest({'setup': setup_key, 'source': sources[index], 'files': files,
+                               'inputs': {name: keys[p] for name, p in producers.items()}})
+    return setup_key, keys
+
+
+def _store(client, cell, writes, entry):
+    """Save a cell's outputs and the values it wrote under entry, replacing it atomically"""
+    tmp_entry = entry.parent / f'.{entry.name}-{uuid.uuid4().hex[:8]}.tmp'
+    saved = kernel_call(client, 'kernel_save', str(tmp_entry), writes)
+    if not saved['saved']:
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+        raise RuntimeError(f"Values written by the cell cannot be stored ({saved['error']})")
+    with open(tmp_entry / 'meta.json', 'w', encoding='utf-8') as f:
+        json.dump({'source': cell.source, 'writes': writes, 'outputs': cell.outputs}, f)
+    if entry.exists():
+        shutil.rmtree(entry)
+    os.replace(tmp_entry, entry)
+
+
+def _kernel_worker(worker, nb, resources, setup, tasks, results, cell_timeout, kernel_name):
+    """
+    Worker thread: start a kernel, run the setup cells, then execute cells
+    from tasks until it receives None. Each task loads the cell's inputs
+    from the entries of the cells that produced them before running it.
+    """
+    client = NotebookClient(copy.deepcopy(nb), timeout=cell_timeout, kernel_name=kernel_name,
+                            resources=resources)
+    try:
+        with client.setup_kernel():
+            for index in setup:
+                client.execute_cell(client.nb.cells[index], index)
+            results.put((worker, 'setup', [client.nb.cells[index] for index in setup], 0.0, None))
+            while True:
+                task = tasks.get()
+                if task is None:
+                    return
+                index, loads, writes, entry = task
+                start = time.perf_counter()
+                try:
+                    for directory, names in loads:
+                        kernel_call(client, 'kernel_load', str(directory), names)
+                    cell = client.nb.cells[index]
+                    client.execute_cell(cell, index)
+                    _store(client, cell, writes, entry)
+                    results.put((worker, index, cell, time.perf_counter() - start, None))
+                except Exception as e:
+                    results.put((worker, index, None, 0.0, e))
+    except Exception as e:
+        results.put((worker, 'setup', None, 0.0, e))
+
+
+def run_incremental(notebook_path, output_path=None, cache_dir=DEFAULT_DATAFLOW_CACHE_DIR,
+                    max_workers=None, cell_timeout=600, kernel_name='python3', dry_run=False,
+                    verbose=True):
+    """
+    Re-execute only the cells of a notebook affected by changes since its last run.
+
+    The cell DAG comes from dataflow.cell_dag. Every cell whose key (see
+    cell_keys) has no entry in cache_dir, plus everything downstream of it,
+    is re-run; the other cells get their stored outputs back without
+    running. Stale cells run on up to max_workers kernels (default: one per
+    CPU). Each kernel runs the setup cells first and, before each cell,
+    loads the exact versions of the values it reads from the entries of the
+    cells that produced them. Cells on independent branches of the DAG
+    therefore run at the same time, and a cell never sees a later cell's
+    changes to a shared DataFrame such as df_clean. Cells that share a file
+    or directory, like training and loading from the model registry, keep
+    their notebook order. The first run has no entries and executes the
+    whole DAG this way.
+
+    With dry_run nothing is executed and the plan is returned. Otherwise
+    the notebook is written to output_path (default: in place) once every
+    stale cell has succeeded; the first failing cell's error is re-raised.
+    Returns a DataFrame with PLAN_COLUMNS.
+    """
+    notebook_path = Path(notebook_path)
+    cache_dir = Path(cache_dir).resolve()
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with open(notebook_path, 'r', encoding='utf-8') as f:
+        nb = nbformat.read(f, as_version=4)
+
+    sources = {index: cell.source for index, cell in enumerate(nb.cells)
+               if cell.cell_type == 'code' and cell.source.strip()}
+    setup, inputs = cell_dag(sources)
+    setup_key, keys = cell_keys(sources, setup, inputs, notebook_path.parent)
+    entries = {index: cache_dir / key[:32] for index, key in keys.items()}
+    stale = downstream(inputs, [index for index, entry in entries.items()
+                                if not (entry / 'meta.json').exists()])
+    depends_on = {index: sorted(set(producers.values())) for index, producers in inputs.items()}
+
+    status = {index: 'setup' for index in setup}
+    status.update({index: 'stale' if index in stale else 'restored' for index in inputs})
+    seconds = dict.fromkeys(sources, 0.0)
+    workers = dict.fromkeys(sources)
+
+    def plan():
+        return pd.DataFrame([(index, status[index], depends_on.get(index, []), seconds[index],
+                              workers[index]) for index in sources],
+                            columns=PLAN_COLUMNS).astype({'worker': 'Int64'})
+
+    if dry_run:
+        return plan()
+
+    setup_entry = cache_dir / f'setup-{setup_key[:32]}.json'
+    for index in sorted(set(inputs) - stale):
+        with open(entries[index] / 'meta.json', encoding='utf-8') as f:
+            nb.cells[index].outputs = [nbformat.from_dict(o) for o in json.load(f)['outputs']]
+        nb.cells[index].execution_count = None
+    if setup_entry.exists():
+        with open(setup_entry, encoding='utf-8') as f:
+            for index, outputs in zip(setup, json.load(f)):
+                nb.cells[index].outputs = [nbformat.from_dict(o) for o in outputs]
+
+    if stale:
+        start = time.perf_counter()
+        n_workers = min(max_workers or os.cpu_count() or 1, len(stale))
+        resources = {'metadata': {'path': str(notebook_path.parent.resolve())}}
+        tasks, results = queue.Queue(), queue.Queue()
+        threads = [threading.Thread(target=_kernel_worker, daemon=True,
+                                    args=(worker, nb, resources, setup, tasks, results,
+                                          cell_timeout, kernel_name))
+                   for worker in range(n_workers)]
+        for thread in threads:
+            thread.start()
+
+        waiting = {index: {p for p in depends_on[index] if p in stale} for index in stale}
+        running, failure, setup_done = 0, None, False
+
+        def dispatch():
+            nonlocal running
+            for index in sorted(i for i, deps in waiting.items() if not deps):
+                del waiting[index]
+                loads = {}
+                for name, producer in inputs[index].items():
+                    if name.startswith(FILE_PREFIX):
+                        continue
+                    loads.setdefault(str(entries[producer]), []).append(name)
+                tasks.put((index, sorted(loads.items()), cell_names(sources[index])[0],
+                           entries[index]))
+                running += 1
+
+        try:
+            dispatch()
+            while running and failure is None:
+                worker, index, cell, elapsed, error = results.get()
+                if index == 'setup':
+                    if error is not None:
+                        failure = error
+                    elif not setup_done:
+                        setup_done = True
+                        for setup_index, setup_cell in zip(setup, cell):
+                            nb.cells[setup_index] = setup_cell
+                        with open(setup_entry, 'w', encoding='utf-8') as f:
+                            json.dump([setup_cell.outputs for setup_cell in cell], f)
+                    continue
+                running -= 1
+                if error is not None:
+                    failure = error
+                    continue
+                nb.cells[index] = cell
+                status[index], seconds[index], workers[index] = 'executed', elapsed, worker
+                if verbose:
+                    print(f"[{index}] executed in {elapsed:.2f}s on kernel {worker}")
+                for deps in waiting.values():
+                    deps.discard(index)
+                dispatch()
+        finally:
+            while not tasks.empty():
+                tasks.get_nowait()
+            for _ in threads:
+                tasks.put(None)
+            for thread in threads:
+                thread.join()
+
+        if failure is not None:
+            raise failure
+        if verbose:
+            print(f"Re-ran {len(stale)} of {len(inputs)} cells on {n_workers} kernel(s) "
+                  f"in {time.perf_counter() - start:.1f}s")
+    elif verbose:
+        print(f"All {len(inputs)} cells are up to date")
+
+    output_path = Path(output_path) if output_path is not None else notebook_path
+    with open(output_path, 'w', encoding='utf-8') as f:
+        nbformat.write(nb, f)
+    return plan()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-run only the notebook cells affected by changes, in parallel where possible")
+    parser.add_argument('notebook')
+    parser.add_argument('--output', help="Write the executed notebook here instead of in place")
+    parser.add_argument('--cache-dir', default=DEFAULT_DATAFLOW_CACHE_DIR)
+    parser.add_argument('--workers', type=int, help="Kernels to run cells on (default: CPU count)")
+    parser.add_argument('--timeout', type=int, default=600, help="Per-cell timeout in seconds")
+    parser.add_argument('--kernel', default='python3')
+    parser.add_argument('--dry-run', action='store_true', help="Print the plan without running")
+    args = parser.parse_args()
+
+    plan = run_incremental(args.notebook, args.output, args.cache_dir, args.workers, args.timeout,
+                           args.kernel, dry_run=args.dry_run)
+    print(plan.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
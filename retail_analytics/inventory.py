@@ -0,0 +1,20 @@
+INVENTORY_COLUMNS = ['TotalQuantity', 'AvgQuantity', 'StdQuantity', 'OrderCount', 'ReorderPoint']
+
+
+def analyze_inventory(df, item_col='StockCode', lead_time_days=7, safety_sigmas=2):
+    """
+    Demand statistics and reorder points per product.
+
+    The reorder point covers lead_time_days of average order quantity plus
+    safety_sigmas standard deviations of safety stock. Returns a DataFrame
+    indexed by item_col with INVENTORY_COLUMNS, sorted by total quantity.
+    """
+    demand = df.groupby(item_col, observed=True).agg(
+        TotalQuantity=('Quantity', 'sum'),
+        AvgQuantity=('Quantity', 'mean'),
+        StdQuantity=('Quantity', 'std'),
+        OrderCount=('InvoiceNo', 'count'),
+    )
+    demand['ReorderPoint'] = (demand['AvgQuantity'] * lead_time_days
+                              + safety_sigmas * demand['StdQuantity'].fillna(0))
+    return demand[INVENTORY_COLUMNS].round(2).sort_values('TotalQuantity', ascending=False)
@@ -0,0 +1,111 @@
+import hashlib
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from .schema import apply_schema
+
+DEFAULT_DATA_FILE = 'Online Retail.xlsx'
+DEFAULT_CACHE_DIR = '.retail_cache'
+
+RAW_COLUMNS = [
+    'InvoiceNo', 'StockCode', 'Description', 'Quantity',
+    'InvoiceDate', 'UnitPrice', 'CustomerID', 'Country'
+]
+
+# Columns that openpyxl returns as a mix of ints and strings
+TEXT_COLUMNS = ['InvoiceNo', 'StockCode', 'Description', 'Country']
+
+
+def file_hash(file_path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _as_text(series):
+    """
+    Convert a mixed int/str column to strings, keeping missing values. The
+    result gets the dtype pandas infers for strings, which is also what
+    read_parquet returns for the column, so cold and cached loads match.
+    """
+    return series.where(series.isna(), series.astype(str)).infer_objects()
+
+
+def normalise_raw_frame(df):
+    """Give the raw workbook columns types that a columnar file can store"""
+    df = df.copy()
+    for col in TEXT_COLUMNS:
+        if col in df.columns:
+            df[col] = _as_text(df[col])
+    if 'InvoiceDate' in df.columns:
+        df['InvoiceDate'] = pd.to_datetime(df['InvoiceDate'])
+    return df
+
+
+def cache_path_for(file_path, digest, cache_dir=DEFAULT_CACHE_DIR, variant='raw'):
+    """Path of the columnar cache file for a given workbook digest"""
+    return Path(cache_dir) / f"{Path(file_path).stem}-{variant}-{digest[:16]}.parquet"
+
+
+def write_parquet_atomic(df, path):
+    """
+    Write df to path via a temporary file, so an interrupted run never
+    leaves a truncated cache behind. The temporary name includes the process
+    id, so kernels building the same cache concurrently do not collide.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f'{path.suffix}.{os.getpid()}.tmp')
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def remove_stale_caches(file_path, keep, cache_dir, variant):
+    """Delete cache files left over from earlier versions of the workbook"""
+    for old in Path(cache_dir).glob(f"{Path(file_path).stem}-{variant}-*.parquet"):
+        if old != keep:
+            old.unlink()
+
+
+def load_retail_data(file_path=DEFAULT_DATA_FILE, cache_dir=DEFAULT_CACHE_DIR,
+                     refresh=False, compact=False, verbose=True):
+    """
+    Load the Online Retail workbook through a Parquet cache.
+
+    The workbook is parsed with pd.read_excel only when no cache exists for
+    its current content hash; later calls read the typed Parquet file. Editing
+    or replacing the workbook changes the hash and triggers a rebuild.
+
+    With compact=True the TRANSACTION_SCHEMA dtypes (categorical strings,
+    int32/float32 numbers) are applied before caching. Categorical columns
+    keep all their categories, so pass observed=True to groupby calls.
+    """
+    variant = 'compact' if compact else 'raw'
+    digest = file_hash(file_path)
+    cache_path = cache_path_for(file_path, digest, cache_dir, variant)
+
+    if cache_path.exists() and not refresh:
+        if verbose:
+            print(f"Loading cached data from {cache_path}")
+        return pd.read_parquet(cache_path)
+
+    if verbose:
+        print(f"Loading data from {file_path} (building cache)...")
+    df = normalise_raw_frame(pd.read_excel(file_path))
+    if compact:
+        df, report = apply_schema(df, report=True)
+        if verbose:
+            print("Memory usage after applying the compact schema:")
+            print(report)
+
+    write_parquet_atomic(df, cache_path)
+    remove_stale_caches(file_path, cache_path, cache_dir, variant)
+
+    if verbose:
+        print(f"Cached {len(df):,} records to {cache_path}")
+    return df
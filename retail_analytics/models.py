@@ -0,0 +1,187 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from sklearn.base import clone
+from sklearn.ensemble import (GradientBoostingRegressor, HistGradientBoostingRegressor,
+                              RandomForestRegressor)
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from .parallel import resolve_n_jobs, shared_array_pool, worker_arrays
+from .registry import ModelRegistry, data_hash, feature_set_hash
+from .scoring import prediction_frame, score_customers
+
+METRIC_COLUMNS = ['R2 Score', 'MAE', 'RMSE', 'Fit Time (s)', 'Predict Time (s)']
+
+
+def default_model_zoo(hist_gradient_boosting=False, random_state=42):
+    """
+    The notebook's candidate regressors. hist_gradient_boosting=True adds
+    HistGradientBoostingRegressor, which bins features into 256 buckets and
+    fits far faster than GradientBoostingRegressor on large customer tables.
+    """
+    models = {
+        'Random Forest': RandomForestRegressor(n_estimators=100, random_state=random_state),
+        'Gradient Boosting': GradientBoostingRegressor(random_state=random_state),
+    }
+    if hist_gradient_boosting:
+        models['Hist Gradient Boosting'] = HistGradientBoostingRegressor(random_state=random_state)
+    return models
+
+
+def _fit_model(name, model, arrays=None):
+    """Fit one estimator on the training arrays and score it on the test arrays"""
+    arrays = worker_arrays() if arrays is None else arrays
+    start = time.perf_counter()
+    model.fit(arrays['X_train'], arrays['y_train'])
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = model.predict(arrays['X_test'])
+    predict_time = time.perf_counter() - start
+
+    y_test = arrays['y_test']
+    metrics = {
+        'R2 Score': r2_score(y_test, y_pred),
+        'MAE': mean_absolute_error(y_test, y_pred),
+        'RMSE': np.sqrt(mean_squared_error(y_test, y_pred)),
+        'Fit Time (s)': fit_time,
+        'Predict Time (s)': predict_time,
+    }
+    return name, model, metrics
+
+
+def train_model_zoo(X_train, y_train, X_test, y_test, models=None, n_jobs=None,
+                    registry=None, feature_names=None, scaler=None):
+    """
+    Fit several regressors concurrently and compare them on a test set.
+
+    Every candidate is cloned and fitted in its own worker process of a
+    shared_array_pool, so the train and test matrices are mapped read-only
+    into the workers once instead of being pickled per model. With one
+    worker the models are fitted in this process.
+
+    With a ModelRegistry, each candidate is looked up by its parameters, the
+    feature_names hash and a hash of the four arrays first; only misses are
+    fitted, and they are registered together with scaler and their metrics.
+
+    Returns (fitted, results) where fitted maps names to fitted estimators
+    and results is a DataFrame indexed by model with METRIC_COLUMNS and a
+    Cached flag.
+    """
+    models = default_model_zoo() if models is None else models
+    arrays = {
+        'X_train': np.asarray(X_train, dtype=np.float64),
+        'y_train': np.asarray(y_train, dtype=np.float64),
+        'X_test': np.asarray(X_test, dtype=np.float64),
+        'y_test': np.asarray(y_test, dtype=np.float64),
+    }
+
+    outcomes, keys = {}, {}
+    if registry is not None:
+        if feature_names is None:
+            feature_names = [f'x{i}' for i in range(arrays['X_train'].shape[1])]
+        feature_hash = feature_set_hash(feature_names)
+        snapshot_hash = data_hash(*arrays.values())
+        for name, model in models.items():
+            keys[name] = registry.key_for(name, model, feature_hash, snapshot_hash)
+            cached = registry.get(keys[name])
+            if cached is not None:
+                outcomes[name] = (cached[0], {**cached[2]['metrics'], 'Cached': True})
+
+    pending = {name: model for name, model in models.items() if name not in outcomes}
+    n_jobs = resolve_n_jobs(n_jobs, len(pending))
+    if n_jobs == 1 or len(pending) < 2:
+        fits = [_fit_model(name, clone(model), arrays) for name, model in pending.items()]
+    else:
+        with shared_array_pool(arrays, n_jobs) as pool:
+            futures = [pool.submit(_fit_model, name, clone(model)) for name, model in pending.items()]
+            fits = [future.result() for future in futures]
+
+    for name, model, metrics in fits:
+        if registry is not None:
+            registry.register(keys[name], model, scaler, name=name, features=feature_names,
+                              feature_hash=feature_hash, snapshot_hash=snapshot_hash,
+                              metrics=metrics)
+        outcomes[name] = (model, {**metrics, 'Cached': False})
+
+    fitted = {name: outcomes[name][0] for name in models}
+    results = pd.DataFrame([outcomes[name][1] for name in models],
+                           index=pd.Index(list(models), name='Model'))
+    return fitted, results[METRIC_COLUMNS + ['Cached']]
+
+
+def train_prediction_models(features, target='total_spent', feature_columns=None, models=None,
+                            test_size=0.2, random_state=42, n_jobs=None, registry=None):
+    """
+    Split and scale a customer feature table, then run train_model_zoo on it.
+
+    feature_columns defaults to every numeric column except the target.
+    Pass a ModelRegistry to reuse models already fitted on the same data.
+    Returns (fitted, scaler, results).
+    """
+    if feature_columns is None:
+        feature_columns = [column for column in features.select_dtypes('number').columns
+                           if column != target]
+    X = features[feature_columns].to_numpy(dtype=np.float64)
+    y = features[target].to_numpy(dtype=np.float64)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=random_state)
+
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X_train)
+    X_test = scaler.transform(X_test)
+    fitted, results = train_model_zoo(X_train, y_train, X_test, y_test, models, n_jobs,
+                                      registry, feature_columns, scaler)
+    return fitted, scaler, results
+
+
+def make_predictions(customer_features, model=None, scaler=None, target='total_spent',
+                     feature_columns=None, model_name='Random Forest', registry=None,
+                     output_path=None, chunk_size=100_000, top_n=10, n_jobs=1, registry_key=None):
+    """
+    Predict the target for every customer and compare it with the actual value.
+
+    model and scaler go together, since a model only fits the scaler it
+    was trained with; passing one without the other raises ValueError.
+    Without both, the model stored under registry_key, or else the newest
+    registered model named model_name whose features are all in
+    customer_features, is loaded from registry (the default ModelRegistry
+    when None) together with its scaler and feature list; an entry without
+    a scaler raises ValueError. Prefer passing the model just trained, since
+    the newest entry may come from another run. feature_columns otherwise
+    defaults to every numeric column except the target.
+
+    Returns a DataFrame indexed like customer_features with PREDICTION_COLUMNS.
+
+    With output_path set, customers are scored in batch mode instead:
+    score_customers() streams them in chunk_size chunks (optionally over
+    n_jobs processes) into a Parquet file at output_path, and only the
+    top_n customers by prediction are returned. customer_features may then
+    also be a Parquet path, in which case feature_columns or a registered
+    model is needed.
+    """
+    if isinstance(customer_features, pd.DataFrame):
+        columns = customer_features.columns
+    else:
+        columns = pq.ParquetFile(customer_features).schema_arrow.names
+    if (model is None) != (scaler is None):
+        raise ValueError("Pass model and scaler together, or neither to load both from the registry")
+    if model is None:
+        registry = ModelRegistry() if registry is None else registry
+        model, scaler, meta = registry.scoring_entry(model_name, registry_key, features=columns)
+        feature_columns = meta['features'] if feature_columns is None else feature_columns
+    if feature_columns is None:
+        feature_columns = [column for column in customer_features.select_dtypes('number').columns
+                           if column != target]
+
+    if output_path is not None:
+        top, _ = score_customers(customer_features, model, scaler, feature_columns, target,
+                                 output_path, chunk_size, top_n, n_jobs)
+        return top
+
+    X = customer_features[feature_columns].to_numpy(dtype=np.float64)
+    return prediction_frame(customer_features, model.predict(scaler.transform(X)), target)
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+
+class CorrelationAccumulator:
+    """
+    Mergeable running means and co-moments for a fixed set of columns.
+
+    Each batch is reduced to its row count, column means and centred
+    co-moment matrix, and folded into the running totals with the pairwise
+    update of Chan et al. (the batched form of Welford's algorithm). Two
+    accumulators, e.g. from separate worker processes or data partitions,
+    merge the same way, so the covariance and correlation of data that never
+    sits in memory at once come out as if computed in one pass.
+
+    Rows with a missing value in any column are skipped (listwise deletion;
+    DataFrame.corr uses pairwise deletion, which only differs when values
+    are missing).
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+
+    def _combine(self, n, mean, comoment):
+        """Fold (n, mean, co-moment) summary statistics into the running totals"""
+        if n == 0:
+            return self
+        total = self.n + n
+        delta = mean - self.mean
+        self.comoment += comoment + np.outer(delta, delta) * (self.n * n / total)
+        self.mean += delta * (n / total)
+        self.n = total
+        return self
+
+    def update(self, batch):
+        """Add a DataFrame (with the accumulator's columns) or a 2-D array of rows"""
+        if isinstance(batch, pd.DataFrame):
+            batch = batch[self.columns].to_numpy(dtype=np.float64)
+        values = np.asarray(batch, dtype=np.float64)
+        values = values[~np.isnan(values).any(axis=1)]
+        if not len(values):
+            return self
+        mean = values.mean(axis=0)
+        centred = values - mean
+        return self._combine(len(values), mean, centred.T @ centred)
+
+    def merge(self, other):
+        """Fold another accumulator over the same columns into this one"""
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge accumulators over different columns")
+        return self._combine(other.n, other.mean, other.comoment)
+
+    def cov(self, ddof=1):
+        """Covariance matrix as a DataFrame"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = self.comoment / (self.n - ddof)
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def corr(self):
+        """Pearson correlation matrix as a DataFrame, like DataFrame.corr()"""
+        std = np.sqrt(np.diag(self.comoment))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.comoment / np.outer(std, std)
+        corr = np.clip(corr, -1, 1)
+        np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+def streaming_corr(batches, columns):
+    """Correlation matrix of columns over an iterable of DataFrame batches"""
+    accumulator = CorrelationAccumulator(columns)
+    for batch in batches:
+        accumulator.update(batch)
+    return accumulator.corr()
@@ -0,0 +1,49 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+from threadpoolctl import threadpool_limits
+
+# Arrays shared with the current worker process, loaded once as read-only memmaps
+_worker_arrays = {}
+
+
+def _init_worker(paths):
+    """Pool initializer: map the shared arrays and keep BLAS/OpenMP single-threaded"""
+    for name, path in paths.items():
+        _worker_arrays[name] = np.load(path, mmap_mode='r')
+    threadpool_limits(limits=1)
+
+
+def worker_arrays():
+    """The shared arrays of the current worker, by name"""
+    return _worker_arrays
+
+
+def resolve_n_jobs(n_jobs, n_tasks):
+    """Number of worker processes for n_tasks tasks (None = all cores)"""
+    return max(1, min(n_jobs or os.cpu_count() or 1, n_tasks))
+
+
+@contextmanager
+def shared_array_pool(arrays, n_jobs):
+    """
+    Process pool whose workers share read-only copies of some arrays.
+
+    Each array is written once to a temporary .npy file and every worker
+    maps it with mmap_mode='r' in the pool initializer, so tasks receive the
+    data through the page cache instead of pickling it per task or copying
+    it per process. Tasks read the arrays with worker_arrays(). Workers are
+    limited to one BLAS/OpenMP thread so the pool does not oversubscribe
+    the cores.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = {}
+        for name, array in arrays.items():
+            paths[name] = os.path.join(tmp_dir, f'{name}.npy')
+            np.save(paths[name], np.ascontiguousarray(array))
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(paths,)) as pool:
+            yield pool
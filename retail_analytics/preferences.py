@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.cluster import KMeans
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import StandardScaler
+
+from .schema import category_codes
+
+
+def preference_matrix(df, customer_col='CustomerID', product_col='Description',
+                      value_col='Quantity'):
+    """
+    Sparse customer x product matrix of summed value_col.
+
+    Rows and columns are the integer codes of the two key columns, so the
+    matrix is assembled straight from (customer, product, quantity) triplets
+    and holds one entry per distinct pair bought. This replaces
+    groupby(...).sum().unstack(fill_value=0), whose dense result has
+    customers x products cells regardless of how sparse purchases are.
+
+    Returns (matrix, customers, products): a float32 CSR matrix and the
+    labels of its rows and columns.
+    """
+    customer_codes, customers = category_codes(df[customer_col])
+    product_codes, products = category_codes(df[product_col])
+    values = df[value_col].to_numpy(dtype=np.float32)
+
+    valid = (customer_codes >= 0) & (product_codes >= 0)
+    matrix = sparse.csr_matrix(
+        (values[valid], (customer_codes[valid], product_codes[valid])),
+        shape=(len(customers), len(products)),
+        dtype=np.float32,
+    )
+    matrix.sum_duplicates()
+
+    # Drop customers and products without any purchases (unused categories)
+    rows = np.flatnonzero(np.diff(matrix.indptr))
+    cols = np.flatnonzero(np.bincount(matrix.indices, minlength=matrix.shape[1]))
+    if len(rows) < matrix.shape[0] or len(cols) < matrix.shape[1]:
+        matrix = matrix[rows][:, cols]
+        customers, products = customers[rows], products[cols]
+
+    return (matrix,
+            pd.Index(customers, name=customer_col),
+            pd.Index(products, name=product_col))
+
+
+def segment_preferences(matrix, n_clusters=3, n_components=50, random_state=42):
+    """
+    Cluster customers on a sparse preference matrix.
+
+    Columns are scaled to unit variance without centring (centring would
+    make the matrix dense), projected to n_components with TruncatedSVD,
+    and clustered with KMeans on that embedding.
+
+    Returns (labels, embedding).
+    """
+    scaled = StandardScaler(with_mean=False).fit_transform(matrix)
+    n_components = max(1, min(n_components, min(matrix.shape) - 1))
+    embedding = TruncatedSVD(n_components=n_components,
+                             random_state=random_state).fit_transform(scaled)
+    labels = KMeans(n_clusters=n_clusters, random_state=random_state,
+                    n_init=10).fit_predict(embedding)
+    return labels, embedding
+
+
+def segment_means(matrix, labels):
+    """Mean preference vector of each segment, as a dense segments x products array"""
+    labels = np.asarray(labels)
+    n_segments = int(labels.max()) + 1 if len(labels) else 0
+    membership = sparse.csr_matrix(
+        (np.ones(len(labels), dtype=np.float32), (labels, np.arange(len(labels)))),
+        shape=(n_segments, len(labels)),
+    )
+    sizes = np.maximum(np.bincount(labels, minlength=n_segments), 1)
+    return np.asarray((membership @ matrix).todense()) / sizes[:, None]
+
+
+def segment_top_products(matrix, labels, products, n=5):
+    """Dict of 'Segment i' -> Series of the n products with the highest mean quantity"""
+    means = segment_means(matrix, labels)
+    top = {}
+    for segment, row in enumerate(means):
+        best = np.argsort(row)[::-1][:n]
+        top[f'Segment {segment}'] = pd.Series(row[best], index=products[best])
+    return top
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+from .schema import category_codes
+
+ELASTICITY_COLUMNS = ['elasticity', 'intercept', 'r_squared', 'n_days', 'avg_price', 'total_quantity']
+
+
+def daily_price_quantity(df, product_col='Description'):
+    """
+    Average unit price and total quantity per product and calendar day.
+
+    The price is the quantity-weighted mean (revenue / quantity) of the
+    day's sales. Returns (product_codes, products, price, quantity) with one
+    array entry per (product, day) pair, ordered by product code.
+    """
+    product_codes, products = category_codes(df[product_col])
+    days = pd.to_datetime(df['InvoiceDate']).to_numpy().astype('datetime64[D]').view(np.int64)
+    quantity = df['Quantity'].to_numpy(dtype=np.float64)
+    revenue = quantity * df['UnitPrice'].to_numpy(dtype=np.float64)
+
+    valid = product_codes >= 0
+    product_codes, days = product_codes[valid], days[valid]
+    quantity, revenue = quantity[valid], revenue[valid]
+
+    # One integer key per (product, day); its codes index the pair sums
+    day_offset = days - days.min() if len(days) else days
+    n_days = int(day_offset.max()) + 1 if len(days) else 1
+    pair_codes, pairs = pd.factorize(product_codes.astype(np.int64) * n_days + day_offset, sort=True)
+    pair_quantity = np.bincount(pair_codes, weights=quantity, minlength=len(pairs))
+    pair_revenue = np.bincount(pair_codes, weights=revenue, minlength=len(pairs))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        price = pair_revenue / pair_quantity
+    return pairs // n_days, products, price, pair_quantity
+
+
+def price_elasticity(df, product_col='Description', min_days=5):
+    """
+    Log-log price elasticity of demand for every product in one batched fit.
+
+    Each product's (price, quantity) observations are its daily average
+    price and total quantity. The regression log(quantity) = a + b log(price)
+    is solved for all products at once from per-product sums of x, y, xy,
+    x^2 and y^2 (np.bincount), so there is no per-product polyfit. b is the
+    elasticity: -1.5 means a 1% price rise goes with 1.5% fewer units.
+
+    Products seen on fewer than min_days days, or whose price never
+    changes, get NaN elasticity. Returns a DataFrame indexed by product with
+    ELASTICITY_COLUMNS.
+    """
+    codes, products, price, quantity = daily_price_quantity(df, product_col)
+    usable = (price > 0) & (quantity > 0)
+    codes, price, quantity = codes[usable], price[usable], quantity[usable]
+    x, y = np.log(price), np.log(quantity)
+
+    n_products = len(products)
+
+    def segment_sum(weights):
+        return np.bincount(codes, weights=weights, minlength=n_products)
+
+    n = segment_sum(None)
+    sx, sy = segment_sum(x), segment_sum(y)
+    sxy, sxx, syy = segment_sum(x * y), segment_sum(x * x), segment_sum(y * y)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sxx_c = sxx - sx * sx / n
+        syy_c = syy - sy * sy / n
+        sxy_c = sxy - sx * sy / n
+        # Rounding can leave a tiny spread for a constant price; treat as none
+        varies = sxx_c > 1e-12 * np.maximum(sxx, 1)
+        slope = np.where(varies, sxy_c / sxx_c, np.nan)
+        intercept = (sy - slope * sx) / n
+        r_squared = np.where(varies & (syy_c > 0), sxy_c * sxy_c / (sxx_c * syy_c), np.nan)
+
+    enough = n >= min_days
+    result = pd.DataFrame({
+        'elasticity': np.where(enough, slope, np.nan),
+        'intercept': np.where(enough, intercept, np.nan),
+        'r_squared': np.where(enough, r_squared, np.nan),
+        'n_days': n.astype(np.int64),
+        'avg_price': segment_sum(price * quantity) / segment_sum(quantity),
+        'total_quantity': segment_sum(quantity),
+    }, index=pd.Index(products, name=product_col))
+    return result[ELASTICITY_COLUMNS]
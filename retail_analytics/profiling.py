@@ -0,0 +1,157 @@
+import html
+import json
+import os
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+DEFAULT_PROFILE_DIR = 'profiles'
+
+PROFILE_COLUMNS = ['cell', 'execution_count', 'wall_time_s', 'peak_traced_mb', 'rss_mb',
+                   'rss_delta_mb', 'first_line']
+
+# The profiler of the running kernel, so profile_cells can be called again safely
+_active = None
+
+
+def rss_mb():
+    """Resident set size of this process in MB, or None where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class CellProfiler:
+    """
+    Times every cell run in an IPython kernel and measures its memory.
+
+    pre_run_cell and post_run_cell hooks record each cell's wall time,
+    the peak of tracemalloc-traced allocations while it ran (NumPy and
+    pandas buffers included) and the process RSS before and after it.
+    After every cell the profile is rewritten as JSON and as an HTML table
+    ranking cells by wall time, so a report exists even if a later cell
+    fails. Cells are matched to notebook indices by their source.
+    """
+
+    def __init__(self, notebook_path, output_dir=DEFAULT_PROFILE_DIR, trace_memory=True):
+        self.notebook_path = Path(notebook_path)
+        self.output_dir = Path(output_dir)
+        self.trace_memory = trace_memory
+        self.records = []
+        self._start = None
+
+    def register(self, shell):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        shell.events.register('pre_run_cell', self.pre_run_cell)
+        shell.events.register('post_run_cell', self.post_run_cell)
+
+    def unregister(self, shell):
+        shell.events.unregister('pre_run_cell', self.pre_run_cell)
+        shell.events.unregister('post_run_cell', self.post_run_cell)
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def pre_run_cell(self, info):
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self._start = (time.perf_counter(), rss_mb(), info.raw_cell)
+
+    def post_run_cell(self, result):
+        if self._start is None:
+            # The cell that registered the hooks has no start record
+            return
+        start, rss_before, source = self._start
+        self._start = None
+        wall_time = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] / 2**20 if tracemalloc.is_tracing() else None
+        rss_after = rss_mb()
+        self.records.append({
+            'source': source,
+            'execution_count': result.execution_count,
+            'wall_time_s': wall_time,
+            'peak_traced_mb': peak,
+            'rss_mb': rss_after,
+            'rss_delta_mb': None if rss_after is None else rss_after - rss_before,
+            'first_line': next((line for line in source.splitlines() if line.strip()), ''),
+            'error': result.error_before_exec is not None or result.error_in_exec is not None,
+        })
+        self.write()
+
+    def _cell_indices(self):
+        """Notebook index of each record, matching sources in execution order"""
+        try:
+            with open(self.notebook_path, 'r', encoding='utf-8') as f:
+                cells = json.load(f)['cells']
+        except (OSError, ValueError, KeyError):
+            return [None] * len(self.records)
+        positions = {}
+        for index, cell in enumerate(cells):
+            if cell.get('cell_type') == 'code':
+                source = cell.get('source', '')
+                source = ''.join(source) if isinstance(source, list) else source
+                positions.setdefault(source.strip(), []).append(index)
+        used = {}
+        indices = []
+        for record in self.records:
+            candidates = positions.get(record['source'].strip(), [])
+            n = used.get(record['source'].strip(), 0)
+            indices.append(candidates[min(n, len(candidates) - 1)] if candidates else None)
+            used[record['source'].strip()] = n + 1
+        return indices
+
+    def report(self):
+        """DataFrame with PROFILE_COLUMNS plus error, ranked by wall time"""
+        report = pd.DataFrame(self.records, columns=PROFILE_COLUMNS + ['error', 'source'])
+        report['cell'] = pd.array(self._cell_indices(), dtype='Int64')
+        report = report.drop(columns='source').sort_values('wall_time_s', ascending=False)
+        report['time_rank'] = range(1, len(report) + 1)
+        report['memory_rank'] = (report['peak_traced_mb'].astype(float)
+                                 .rank(ascending=False, method='min').astype('Int64'))
+        return report.reset_index(drop=True)
+
+    def write(self):
+        """Write <notebook>.profile.json and <notebook>.profile.html; returns both paths"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        report = self.report()
+        stem = self.output_dir / f'{self.notebook_path.stem}.profile'
+        summary = {
+            'notebook': self.notebook_path.name,
+            'cells': len(report),
+            'total_wall_time_s': float(report['wall_time_s'].sum()),
+            'max_peak_traced_mb': (None if report['peak_traced_mb'].isna().all()
+                                   else float(report['peak_traced_mb'].max())),
+            'profile': json.loads(report.to_json(orient='records')),
+        }
+        with open(f'{stem}.json', 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+        table = report.to_html(index=False, float_format=lambda x: f'{x:.3f}', na_rep='',
+                               escape=True)
+        with open(f'{stem}.html', 'w', encoding='utf-8') as f:
+            f.write(f"<html><head><meta charset='utf-8'>"
+                    f"<title>{html.escape(self.notebook_path.name)} profile</title></head><body>"
+                    f"<h2>{html.escape(self.notebook_path.name)}</h2>"
+                    f"<p>{summary['cells']} cells, {summary['total_wall_time_s']:.1f}s in total. "
+                    f"Ranked by wall time; peak_traced_mb is the tracemalloc peak while the "
+                    f"cell ran and rss_mb the process RSS after it.</p>{table}</body></html>")
+        return Path(f'{stem}.json'), Path(f'{stem}.html')
+
+
+def profile_cells(notebook_path, output_dir=DEFAULT_PROFILE_DIR, trace_memory=True):
+    """
+    Profile every following cell of the running notebook. Called by the
+    cell that profile_notebooks.py injects; calling it again replaces the
+    previous profiler.
+    """
+    global _active
+    shell = get_ipython()  # noqa: F821 - only called inside a kernel
+    if _active is not None:
+        _active.unregister(shell)
+    _active = CellProfiler(notebook_path, output_dir, trace_memory)
+    _active.register(shell)
+    return _active
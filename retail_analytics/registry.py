@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+
+from .loader import DEFAULT_CACHE_DIR
+
+DEFAULT_REGISTRY_DIR = os.path.join(DEFAULT_CACHE_DIR, 'models')
+
+
+def _digest(payload):
+    """SHA-256 hex digest of a JSON-serialisable payload"""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def feature_set_hash(columns, target=None):
+    """Hash of the ordered feature column names and the target"""
+    return _digest({'features': [str(c) for c in columns], 'target': target})
+
+
+def data_hash(*arrays):
+    """Hash of the contents, shapes and dtypes of some arrays or DataFrames"""
+    digest = hashlib.sha256()
+    for array in arrays:
+        values = np.ascontiguousarray(np.asarray(array))
+        digest.update(f'{values.shape}{values.dtype}'.encode())
+        if values.dtype == object:
+            values = pd.util.hash_pandas_object(pd.DataFrame(values.reshape(len(values), -1)),
+                                                index=False).to_numpy()
+        digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+def model_params(model):
+    """JSON-safe view of an estimator's hyperparameters"""
+    return json.loads(json.dumps(model.get_params(), sort_keys=True, default=str))
+
+
+class ModelRegistry:
+    """
+    Local store of fitted estimators and their scalers.
+
+    Every entry is a directory under root named by its key, holding
+    model.joblib, scaler.joblib and meta.json. The key hashes the model
+    name, estimator class and hyperparameters, the feature-set hash, the
+    training-data snapshot hash and the scikit-learn version, so a lookup
+    with the same inputs returns the stored model instead of refitting it.
+    Entries are written to a temporary directory and renamed into place,
+    and loaded entries are kept in memory for the rest of the session.
+    """
+
+    def __init__(self, root=DEFAULT_REGISTRY_DIR):
+        self.root = Path(root)
+        self._loaded = {}
+
+    def key_for(self, name, model, feature_hash, snapshot_hash):
+        """Registry key of an unfitted estimator trained on a given snapshot"""
+        return _digest({
+            'name': name,
+            'estimator': type(model).__name__,
+            'params': model_params(model),
+            'feature_set_hash': feature_hash,
+            'data_hash': snapshot_hash,
+            'sklearn': sklearn.__version__,
+        })
+
+    def path_for(self, key):
+        return self.root / key[:32]
+
+    def get(self, key):
+        """(model, scaler, meta) stored under key, or None"""
+        if key in self._loaded:
+            return self._loaded[key]
+        path = self.path_for(key)
+        if not (path / 'meta.json').exists():
+            return None
+        with open(path / 'meta.json', encoding='utf-8') as f:
+            meta = json.load(f)
+        scaler_path = path / 'scaler.joblib'
+        entry = (joblib.load(path / 'model.joblib'),
+                 joblib.load(scaler_path) if scaler_path.exists() else None,
+                 meta)
+        self._loaded[key] = entry
+        return entry
+
+    def register(self, key, model, scaler=None, name=None, features=None,
+                 feature_hash=None, snapshot_hash=None, metrics=None):
+        """Store a fitted model (and scaler) under key and return its metadata"""
+        meta = {
+            'key': key,
+            'name': name,
+            'estimator': type(model).__name__,
+            'params': model_params(model),
+            'features': [str(c) for c in features] if features is not None else None,
+            'feature_set_hash': feature_hash,
+            'data_hash': snapshot_hash,
+            'metrics': {k: float(v) for k, v in (metrics or {}).items()},
+            'sklearn': sklearn.__version__,
+            'created': datetime.now(timezone.utc).isoformat(),
+        }
+        path = self.path_for(key)
+        tmp_path = self.root / f'.{path.name}-{uuid.uuid4().hex[:8]}.tmp'
+        tmp_path.mkdir(parents=True)
+        try:
+            joblib.dump(model, tmp_path / 'model.joblib')
+            if scaler is not None:
+                joblib.dump(scaler, tmp_path / 'scaler.joblib')
+            with open(tmp_path / 'meta.json', 'w', encoding='utf-8') as f:
+                json.dump(meta, f, indent=2)
+            if path.exists():
+                shutil.rmtree(path)
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                shutil.rmtree(tmp_path)
+        self._loaded[key] = (model, scaler, meta)
+        return meta
+
+    def entries(self):
+        """Metadata of every entry as a DataFrame, newest first"""
+        rows = []
+        for meta_path in self.root.glob('*/meta.json'):
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            rows.append({**{k: v for k, v in meta.items() if k != 'metrics'}, **meta['metrics']})
+        if not rows:
+            return pd.DataFrame(columns=['key', 'name', 'estimator', 'created', 'features'])
+        return pd.DataFrame(rows).sort_values('created', ascending=False, ignore_index=True)
+
+    def latest(self, name=None, features=None):
+        """
+        Newest (model, scaler, meta) entry, optionally only for a model name
+        and a list of feature columns that must all be available
+        """
+        entries = self.entries()
+        if name is not None:
+            entries = entries[entries['name'] == name]
+        if features is not None:
+            available = set(map(str, features))
+            entries = entries[entries['features'].map(
+                lambda cols: cols is not None and set(cols) <= available).astype(bool)]
+        if not len(entries):
+            raise LookupError(f"No registered model{f' named {name!r}' if name else ''} "
+                              f"in {self.root}")
+        return self.get(entries['key'].iloc[0])
+
+    def scoring_entry(self, name=None, key=None, features=None):
+        """
+        (model, scaler, meta) to score with: the entry stored under key, or
+        else the newest entry as in latest(). Raises LookupError for an
+        unknown key and ValueError for an entry stored without its scaler.
+        """
+        if key is not None:
+            entry = self.get(key)
+            if entry is None:
+                raise LookupError(f"No registered model with key {key[:12]} in {self.root}")
+        else:
+            entry = self.latest(name, features=features)
+        if entry[1] is None:
+            raise ValueError(f"Registered model {entry[2]['key'][:12]} ({entry[2]['name']}) "
+                             f"was stored without a scaler and cannot score raw features")
+        return entry
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+RFM_METRICS = ['Recency', 'Frequency', 'TotalRevenue']
+
+# Segment rules in priority order: (segment, recency, frequency, monetary),
+# each an inclusive (low, high) score range. The first matching rule wins,
+# as in the notebook's if/elif chain; DEFAULT_SEGMENT catches the rest.
+SEGMENT_RULES = [
+    ('Champions', (4, 5), (4, 5), (4, 5)),
+    ('Loyal Customers', (3, 5), (3, 5), (3, 5)),
+    ('Potential Loyalists', (3, 5), (1, 5), (2, 5)),
+    ('Lost Customers', (1, 2), (1, 2), (1, 2)),
+]
+DEFAULT_SEGMENT = 'Average Customers'
+
+
+def quantile_scores(values, q=5, ascending=None):
+    """
+    Quantile scores 1..q for each column of a 2-D array.
+
+    A row's score is its rank divided into q equal-sized bins, where tied
+    values share the lowest rank of their group, so equal values always get
+    the same score (pd.qcut raises on such ties instead). That score only
+    depends on the q - 1 order statistics at the bin boundaries, so each
+    column needs one np.partition and q - 1 comparisons rather than a full
+    argsort. ascending holds one flag per column; False
+    reverses the scale so the smallest values score q. Missing values score
+    0. Returns an int8 array shaped like values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        return quantile_scores(values[:, None], q, ascending)[:, 0]
+    n, n_cols = values.shape
+    if ascending is None:
+        ascending = [True] * n_cols
+
+    scores = np.empty((n, n_cols), dtype=np.int8)
+    for j in range(n_cols):
+        column = np.ascontiguousarray(values[:, j])
+        missing = np.isnan(column)
+        n_valid = n - int(missing.sum())
+
+        # A value with rank r scores r * q // n_valid + 1, so it passes bin
+        # edge k exactly when it exceeds the value ranked ceil(k * n_valid / q) - 1
+        boundary = -(-np.arange(1, q) * n_valid // q) - 1
+        edges = np.full(q - 1, -np.inf)
+        inside = boundary >= 0
+        if inside.any():
+            edges[inside] = np.partition(column, boundary[inside])[boundary[inside]]
+
+        score = np.ones(n, dtype=np.int8)
+        for edge in edges:
+            score += column > edge
+        if not ascending[j]:
+            score = q + 1 - score
+        score[missing] = 0
+        scores[:, j] = score
+    return scores
+
+
+def segment_table(q=5, rules=SEGMENT_RULES, default=DEFAULT_SEGMENT):
+    """
+    Segment code for every (recency, frequency, monetary) score combination.
+
+    The rules are evaluated once with np.select over the q**3 possible score
+    triples, so labelling customers is a single array lookup. Returns
+    (table, labels) where table is indexed by
+    (r - 1) * q * q + (f - 1) * q + (m - 1).
+    """
+    grid = np.indices((q, q, q)).reshape(3, -1) + 1
+    conditions = [
+        np.all([(grid[i] >= low) & (grid[i] <= high)
+                for i, (low, high) in enumerate(ranges)], axis=0)
+        for _, *ranges in rules
+    ]
+    labels = [segment for segment, *_ in rules] + [default]
+    table = np.select(conditions, np.arange(len(rules)), default=len(rules))
+    return table.astype(np.int8), labels
+
+
+def rfm_segments(customer_features, metrics=RFM_METRICS, q=5,
+                 rules=SEGMENT_RULES, default=DEFAULT_SEGMENT):
+    """
+    Add RFM scores and segments to a customer feature table.
+
+    metrics names the recency, frequency and monetary columns. Adds one
+    int8 '<metric>_Score' column per metric (recency reversed, so recent
+    customers score q), an int16 RFM_Score such as 545, and a categorical
+    Customer_Segment. Customers with a missing metric keep score 0 and fall
+    through to the default segment.
+    """
+    rfm = customer_features.copy()
+    scores = quantile_scores(rfm[list(metrics)].to_numpy(dtype=np.float64), q,
+                             ascending=[False, True, True])
+    for i, metric in enumerate(metrics):
+        rfm[f'{metric}_Score'] = scores[:, i]
+
+    r, f, m = (scores[:, i].astype(np.int16) for i in range(3))
+    rfm['RFM_Score'] = r * 100 + f * 10 + m
+
+    table, labels = segment_table(q, rules, default)
+    valid = (scores > 0).all(axis=1)
+    index = np.where(valid, (r - 1) * q * q + (f - 1) * q + (m - 1), 0)
+    codes = np.where(valid, table[index], len(labels) - 1)
+    rfm['Customer_Segment'] = pd.Categorical.from_codes(codes, categories=labels)
+    return rfm
@@ -0,0 +1,148 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import nbformat
+import pandas as pd
+from nbconvert.preprocessors import CellExecutionError, ExecutePreprocessor
+
+from .artifacts import load_clean_data
+from .cellcache import DEFAULT_CELL_CACHE_DIR, run_cached
+from .loader import DEFAULT_CACHE_DIR, DEFAULT_DATA_FILE
+
+ANALYSIS_NOTEBOOKS = [
+    'LalitNayyarIIMKMod4_analysis_fin.ipynb',
+    'LalitNayyarIIMKMod4_descriptive_analysis_fin.ipynb',
+    'LalitNayyarIIMKMod4_behavior_diagnostic_analysis_fin.ipynb',
+    'LalitNayyarIIMKMod4_predictive_analysis_fin.ipynb'
+]
+
+RUN_COLUMNS = ['notebook', 'status', 'wall_time_s', 'cells', 'error']
+
+
+def execute_notebook(notebook_path, output_path=None, cell_timeout=600, kernel_name='python3',
+                     cache_dir=None):
+    """
+    Execute one notebook headlessly in its own kernel.
+
+    The kernel starts in the notebook's directory and every cell must
+    finish within cell_timeout seconds. On success the executed notebook is
+    written to output_path (default: in place); on failure the file is left
+    untouched and the error is reported, including kernels that die or
+    fail to start. With a cache_dir, cells are run
+    through cellcache.run_cached so unchanged cells are restored instead.
+    Returns a dict with RUN_COLUMNS.
+    """
+    notebook_path = Path(notebook_path)
+    with open(notebook_path, 'r', encoding='utf-8') as f:
+        nb = nbformat.read(f, as_version=4)
+    n_cells = sum(cell.cell_type == 'code' for cell in nb.cells)
+    output_path = Path(output_path) if output_path is not None else notebook_path
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    status, error = 'ok', None
+    try:
+        if cache_dir is not None:
+            run_cached(notebook_path, output_path, cache_dir, cell_timeout, kernel_name,
+                       verbose=False)
+        else:
+            processor = ExecutePreprocessor(timeout=cell_timeout, kernel_name=kernel_name)
+            processor.preprocess(nb, {'metadata': {'path': str(notebook_path.parent.resolve())}})
+            with open(output_path, 'w', encoding='utf-8') as f:
+                nbformat.write(nb, f)
+    except CellExecutionError as e:
+        status, error = 'error', f"{e.ename}: {e.evalue}"
+    except TimeoutError:
+        status, error = 'timeout', f"a cell ran longer than {cell_timeout}s"
+    except Exception as e:
+        # DeadKernelError, a kernel that cannot start, an unreadable output path...
+        status, error = 'failed', f"{type(e).__name__}: {e}"
+    wall_time = time.perf_counter() - start
+    return {'notebook': notebook_path.name, 'status': status, 'wall_time_s': wall_time,
+            'cells': n_cells, 'error': error}
+
+
+def warm_caches(data_file=DEFAULT_DATA_FILE, cache_dir=DEFAULT_CACHE_DIR):
+    """Build the raw and cleaned Parquet caches once, before kernels race to do it"""
+    if os.path.exists(data_file):
+        load_clean_data(data_file, cache_dir=cache_dir, verbose=False)
+
+
+def run_notebooks(notebooks=ANALYSIS_NOTEBOOKS, output_dir=None, max_workers=None,
+                  cell_timeout=600, kernel_name='python3', data_file=DEFAULT_DATA_FILE,
+                  cache_dir=None, verbose=True, data_cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Execute notebooks concurrently, each in a separate process and kernel.
+
+    The shared data caches for data_file are warmed in data_cache_dir first,
+    so the notebooks only read them. Executed notebooks are written to
+    output_dir (default: in place). cache_dir turns on the cell-level
+    execution cache for every notebook. A refresh takes about as long as the
+    slowest notebook as long as there are cores for all kernels.
+
+    Returns a DataFrame with RUN_COLUMNS, one row per notebook.
+    """
+    notebooks = [str(nb) for nb in notebooks]
+    missing = [nb for nb in notebooks if not os.path.exists(nb)]
+    if missing:
+        raise FileNotFoundError(f"Notebooks not found: {', '.join(missing)}")
+
+    if not notebooks:
+        return pd.DataFrame(columns=RUN_COLUMNS)
+
+    start = time.perf_counter()
+    warm_caches(data_file, data_cache_dir)
+    max_workers = max(1, max_workers or len(notebooks))
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            nb: pool.submit(execute_notebook, nb,
+                            Path(output_dir) / Path(nb).name if output_dir else None,
+                            cell_timeout, kernel_name, cache_dir)
+            for nb in notebooks
+        }
+        results = []
+        for nb, future in futures.items():
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker process itself died, e.g. BrokenProcessPool
+                result = {'notebook': Path(nb).name, 'status': 'failed', 'wall_time_s': 0.0,
+                          'cells': None, 'error': f"{type(e).__name__}: {e}"}
+            results.append(result)
+            if verbose:
+                print(f"{result['notebook']}: {result['status']} in {result['wall_time_s']:.1f}s"
+                      + (f" ({result['error']})" if result['error'] else ""))
+
+    results = pd.DataFrame(results, columns=RUN_COLUMNS)
+    if verbose:
+        total = time.perf_counter() - start
+        print(f"Executed {len(results)} notebook(s) in {total:.1f}s "
+              f"(sum of notebook times {results['wall_time_s'].sum():.1f}s)")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Execute the analysis notebooks headlessly")
+    parser.add_argument('notebooks', nargs='*', default=ANALYSIS_NOTEBOOKS)
+    parser.add_argument('--output-dir', help="Write executed notebooks here instead of in place")
+    parser.add_argument('--workers', type=int, help="Notebooks to run at once (default: all)")
+    parser.add_argument('--timeout', type=int, default=600, help="Per-cell timeout in seconds")
+    parser.add_argument('--kernel', default='python3')
+    parser.add_argument('--data-file', default=DEFAULT_DATA_FILE, help="Workbook to warm caches for")
+    parser.add_argument('--data-cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f"Parquet data cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument('--cache', nargs='?', const=DEFAULT_CELL_CACHE_DIR,
+                        help=f"Reuse unchanged cells from a cell cache (default: {DEFAULT_CELL_CACHE_DIR})")
+    args = parser.parse_args()
+
+    results = run_notebooks(args.notebooks, args.output_dir, args.workers, args.timeout,
+                            args.kernel, args.data_file, args.cache,
+                            data_cache_dir=args.data_cache_dir)
+    raise SystemExit(0 if (results['status'] == 'ok').all() else 1)
+
+
+if __name__ == '__main__':
+    main()
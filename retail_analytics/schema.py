@@ -0,0 +1,69 @@
+import pandas as pd
+
+# Compact dtypes for the transaction table. String columns are dictionary
+# encoded, CustomerID uses the nullable Int32 type because the raw workbook
+# has missing IDs, and prices fit comfortably in float32.
+TRANSACTION_SCHEMA = {
+    'InvoiceNo': 'category',
+    'StockCode': 'category',
+    'Description': 'category',
+    'Quantity': 'int32',
+    'InvoiceDate': 'datetime64[ns]',
+    'UnitPrice': 'float32',
+    'CustomerID': 'Int32',
+    'Country': 'category',
+}
+
+
+def _convert_column(series, dtype):
+    """Convert one column to the schema dtype"""
+    if dtype == 'category':
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return series
+        # Mixed int/str values would otherwise become separate categories
+        return series.where(series.isna(), series.astype(str)).astype('category')
+    if dtype.startswith('datetime64'):
+        return pd.to_datetime(series).astype(dtype)
+    if dtype == 'Int32':
+        return pd.to_numeric(series, errors='coerce').round().astype('Int32')
+    return series.astype(dtype)
+
+
+def apply_schema(df, schema=TRANSACTION_SCHEMA, report=False):
+    """
+    Return a copy of df with the schema dtypes applied.
+
+    Columns not mentioned in the schema are left unchanged. With report=True
+    a (frame, memory_report) tuple is returned instead.
+    """
+    compact = df.copy()
+    for col, dtype in schema.items():
+        if col in compact.columns:
+            compact[col] = _convert_column(compact[col], dtype)
+
+    if report:
+        return compact, memory_report(df, compact)
+    return compact
+
+
+def memory_report(before, after):
+    """Per-column memory usage in MB before and after a dtype change"""
+    before_mb = before.memory_usage(deep=True, index=False) / 1024 ** 2
+    after_mb = after.memory_usage(deep=True, index=False) / 1024 ** 2
+
+    report = pd.DataFrame({
+        'dtype_before': before.dtypes.astype(str),
+        'dtype_after': after.dtypes.astype(str),
+        'mb_before': before_mb,
+        'mb_after': after_mb,
+    })
+    report.loc['Total', ['mb_before', 'mb_after']] = [before_mb.sum(), after_mb.sum()]
+    report['reduction_pct'] = (1 - report['mb_after'] / report['mb_before']) * 100
+    return report.round({'mb_before': 3, 'mb_after': 3, 'reduction_pct': 1})
+
+
+def category_codes(series):
+    """(codes, labels) for a key column, reusing categorical codes when present"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories
+    return pd.factorize(series, sort=True)
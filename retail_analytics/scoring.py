@@ -0,0 +1,130 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from threadpoolctl import threadpool_limits
+
+PREDICTION_COLUMNS = ['Actual_Revenue', 'Predicted_Revenue', 'Prediction_Error', 'Error_Percentage']
+
+# Model and scaler of the current worker process, unpickled once per worker
+_worker_model = None
+_worker_scaler = None
+
+
+def _init_scorer(model, scaler):
+    """Pool initializer: keep the model and scaler and stay single-threaded"""
+    global _worker_model, _worker_scaler
+    _worker_model, _worker_scaler = model, scaler
+    threadpool_limits(limits=1)
+
+
+def prediction_frame(customer_features, predicted, target=None):
+    """Predictions with the actual target, absolute error and error percentage"""
+    if target is None or target not in customer_features.columns:
+        return pd.DataFrame({'Predicted_Revenue': predicted}, index=customer_features.index)
+    actual = customer_features[target].to_numpy(dtype=np.float64)
+    results = pd.DataFrame({'Actual_Revenue': actual, 'Predicted_Revenue': predicted},
+                           index=customer_features.index)
+    results['Prediction_Error'] = np.abs(actual - predicted)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        results['Error_Percentage'] = results['Prediction_Error'] / actual * 100
+    return results[PREDICTION_COLUMNS]
+
+
+def score_chunk(chunk, feature_columns, target=None, model=None, scaler=None):
+    """Scale and predict one chunk of customers (with the worker's model by default)"""
+    model = _worker_model if model is None else model
+    scaler = _worker_scaler if scaler is None else scaler
+    X = chunk[feature_columns].to_numpy(dtype=np.float64)
+    return prediction_frame(chunk, model.predict(scaler.transform(X)), target)
+
+
+def iter_customer_chunks(source, chunk_size=100_000, id_column='CustomerID'):
+    """
+    Customer feature chunks of at most chunk_size rows from a DataFrame, a
+    Parquet file path (read batch by batch) or an iterable of DataFrames.
+
+    Parquet chunks are indexed by id_column when the file has it as a
+    column, so customers keep their IDs rather than their position in the
+    chunk.
+    """
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunk_size):
+            yield source.iloc[start:start + chunk_size]
+    elif isinstance(source, (str, Path)):
+        parquet_file = pq.ParquetFile(source)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            chunk = pa.Table.from_batches([batch]).to_pandas()
+            if id_column is not None and id_column in chunk.columns:
+                chunk = chunk.set_index(id_column)
+            yield chunk
+    else:
+        for frame in source:
+            for start in range(0, len(frame), chunk_size):
+                yield frame.iloc[start:start + chunk_size]
+
+
+def score_customers(source, model, scaler, feature_columns, target=None, output_path=None,
+                    chunk_size=100_000, top_n=10, n_jobs=1, id_column='CustomerID'):
+    """
+    Score customers chunk by chunk with bounded memory.
+
+    Chunks from iter_customer_chunks() are scaled and predicted one at a
+    time, or by n_jobs worker processes (None = all cores) that each
+    receive the model and scaler once. At most two chunks per worker are in
+    flight, so memory depends on chunk_size rather than the number of
+    customers. Each scored chunk is appended to a Parquet file at
+    output_path as one row group, with the customer index (id_column for
+    Parquet sources) as a column, and only a running top-N of predictions
+    is kept in memory.
+
+    Returns (top, n_scored): the top_n customers by predicted value and
+    the number of customers scored.
+    """
+    feature_columns = list(feature_columns)
+    n_jobs = n_jobs or os.cpu_count() or 1
+    n_scored = 0
+    top = None
+    writer = None
+
+    def consume(scored):
+        nonlocal n_scored, top, writer
+        n_scored += len(scored)
+        candidates = scored.nlargest(top_n, 'Predicted_Revenue')
+        top = candidates if top is None else pd.concat([top, candidates]).nlargest(
+            top_n, 'Predicted_Revenue')
+        if output_path is not None:
+            table = pa.Table.from_pandas(scored, preserve_index=True)
+            if writer is None:
+                Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+                writer = pq.ParquetWriter(output_path, table.schema)
+            writer.write_table(table)
+
+    chunks = iter_customer_chunks(source, chunk_size, id_column)
+    try:
+        if n_jobs == 1:
+            for chunk in chunks:
+                consume(score_chunk(chunk, feature_columns, target, model, scaler))
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_scorer,
+                                     initargs=(model, scaler)) as pool:
+                # Results are consumed in submission order so the output keeps the input order
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(score_chunk, chunk, feature_columns, target))
+                    if len(pending) >= 2 * n_jobs:
+                        consume(pending.popleft().result())
+                while pending:
+                    consume(pending.popleft().result())
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if top is None:
+        top = pd.DataFrame(columns=['Predicted_Revenue'])
+    return top, n_scored
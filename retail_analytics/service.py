@@ -0,0 +1,226 @@
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from .registry import DEFAULT_REGISTRY_DIR, ModelRegistry
+
+
+class _Request:
+    """Rows waiting in the micro-batch queue and the slot for their predictions"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.start = time.perf_counter()
+        self.done = threading.Event()
+        self.predictions = None
+        self.error = None
+
+
+class ScoringService:
+    """
+    In-process scorer that micro-batches concurrent requests.
+
+    predict() puts its rows on a queue and waits. A single batching thread
+    takes the first waiting request, keeps collecting requests for up to
+    max_wait_ms or until max_batch rows are queued, and answers all of them
+    with one scaler.transform and one model.predict call. Per-request
+    latencies (queueing plus prediction) are kept for the last
+    latency_window requests. Rows of the wrong width are rejected before
+    they are queued, so one bad request cannot fail the others in its batch.
+    """
+
+    def __init__(self, model, scaler, feature_columns, max_batch=512, max_wait_ms=2.0,
+                 latency_window=10_000):
+        self.model = model
+        self.scaler = scaler
+        self.feature_columns = list(feature_columns)
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.latencies = deque(maxlen=latency_window)
+        self.n_requests = 0
+        self.n_batches = 0
+        self.n_rows = 0
+        self._stats_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_registry(cls, model_name='Random Forest', registry=None, key=None, **kwargs):
+        """
+        Service for the registered model stored under key, or else the newest
+        one of a name, with its scaler and features. Raises ValueError if the
+        entry has no scaler.
+        """
+        registry = ModelRegistry() if registry is None else registry
+        model, scaler, meta = registry.scoring_entry(model_name, key)
+        return cls(model, scaler, meta['features'], **kwargs)
+
+    def rows_from(self, payload):
+        """
+        Feature matrix from a request body: {"features": {...}} or a list
+        of such mappings under "instances", or rows of values in feature order
+        """
+        instances = payload['instances'] if 'instances' in payload else [payload['features']]
+        rows = [[row[c] for c in self.feature_columns] if isinstance(row, dict) else row
+                for row in instances]
+        return self.check_rows(rows)
+
+    def check_rows(self, rows):
+        """Rows as a 2-D float array; ValueError unless they have one value per feature"""
+        rows = np.asarray(rows, dtype=np.float64)
+        rows = rows.reshape(1, -1) if rows.ndim == 1 else rows.reshape(len(rows), -1)
+        if rows.shape[1] != len(self.feature_columns):
+            raise ValueError(f"Expected {len(self.feature_columns)} features "
+                             f"({', '.join(self.feature_columns)}), got {rows.shape[1]}")
+        return rows
+
+    def predict(self, rows, timeout=30):
+        """Predictions for a 2-D array of rows, batched with concurrent callers"""
+        request = _Request(self.check_rows(rows))
+        self._queue.put(request)
+        if not request.done.wait(timeout):
+            raise TimeoutError("Scoring request timed out")
+        if request.error is not None:
+            raise request.error
+        return request.predictions
+
+    def _run(self):
+        """Batching loop: gather waiting requests and score them together"""
+        while True:
+            batch = [self._queue.get()]
+            n_rows = len(batch[0].rows)
+            deadline = time.perf_counter() + self.max_wait
+            while n_rows < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                n_rows += len(request.rows)
+
+            try:
+                rows = np.concatenate([request.rows for request in batch])
+                predictions = self.model.predict(self.scaler.transform(rows))
+                bounds = np.cumsum([len(request.rows) for request in batch])[:-1]
+                for request, part in zip(batch, np.split(predictions, bounds)):
+                    request.predictions = part
+            except Exception as e:
+                for request in batch:
+                    request.error = e
+
+            finished = time.perf_counter()
+            with self._stats_lock:
+                self.latencies.extend(finished - request.start for request in batch)
+                self.n_requests += len(batch)
+                self.n_batches += 1
+                self.n_rows += n_rows
+            for request in batch:
+                request.done.set()
+
+    def stats(self):
+        """Request counts, mean batch size and p50/p99 latency in milliseconds"""
+        with self._stats_lock:
+            latencies = np.array(self.latencies) * 1000
+            n_requests, n_batches, n_rows = self.n_requests, self.n_batches, self.n_rows
+        p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (np.nan, np.nan)
+        return {
+            'requests': n_requests,
+            'batches': n_batches,
+            'rows': n_rows,
+            'mean_batch_requests': n_requests / n_batches if n_batches else 0.0,
+            'p50_ms': float(p50),
+            'p99_ms': float(p99),
+        }
+
+
+def make_handler(service):
+    """HTTP handler class bound to a ScoringService"""
+
+    class ScoringHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send(200, {'status': 'ok', 'features': service.feature_columns})
+            elif self.path == '/stats':
+                self._send(200, service.stats())
+            else:
+                self._send(404, {'error': f'Unknown path {self.path}'})
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self._send(404, {'error': f'Unknown path {self.path}'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                rows = service.rows_from(json.loads(self.rfile.read(length)))
+            except (ValueError, KeyError, TypeError) as e:
+                self._send(400, {'error': str(e)})
+                return
+            try:
+                self._send(200, {'predictions': service.predict(rows).tolist()})
+            except Exception as e:
+                self._send(500, {'error': str(e)})
+
+        def log_message(self, format, *args):
+            pass
+
+    return ScoringHandler
+
+
+class ScoringServer(ThreadingHTTPServer):
+    """Threaded HTTP server with a listen backlog sized for bursts of clients"""
+    request_queue_size = 256
+    daemon_threads = True
+
+
+def serve(service, host='127.0.0.1', port=8765):
+    """Serve POST /predict, GET /health and GET /stats until interrupted"""
+    server = ScoringServer((host, port), make_handler(service))
+    print(f"Scoring service listening on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Latency: {service.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a registered model over HTTP")
+    parser.add_argument('--model', default='Random Forest', help="Registered model name")
+    parser.add_argument('--registry', default=DEFAULT_REGISTRY_DIR, help="Model registry directory")
+    parser.add_argument('--key', help="Registry key of the model to serve (default: newest --model)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--max-batch', type=int, default=512, help="Rows per predict call")
+    parser.add_argument('--max-wait-ms', type=float, default=2.0,
+                        help="How long to wait for more requests before predicting")
+    args = parser.parse_args()
+
+    service = ScoringService.from_registry(args.model, ModelRegistry(args.registry), args.key,
+                                           max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    serve(service, args.host, args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+import pandas as pd
+
+from .cleaning import clean_data
+from .dedup import StreamingDeduplicator
+from .loader import DEFAULT_DATA_FILE, RAW_COLUMNS, normalise_raw_frame
+from .schema import apply_schema
+
+DEFAULT_BATCH_SIZE = 50000
+
+NUMERIC_COLUMNS = ['Quantity', 'UnitPrice', 'CustomerID']
+
+
+def _records_to_frame(records, header):
+    """
+    Build a typed DataFrame from a list of worksheet row tuples. Numeric
+    columns are always float64, so every batch has the same dtypes whether
+    or not it happens to contain a missing value.
+    """
+    df = pd.DataFrame.from_records(records, columns=header)
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    return normalise_raw_frame(df)
+
+
+def iter_excel_batches(file_path=DEFAULT_DATA_FILE, batch_size=DEFAULT_BATCH_SIZE,
+                       clean=True, drop_duplicates=False, sheet_name=None):
+    """
+    Yield the workbook as DataFrames of at most batch_size rows.
+
+    The sheet is walked with openpyxl's read-only row iterator, so only one
+    batch of raw rows is held in memory at a time. When clean is True each
+    batch goes through clean_data before it is yielded. drop_duplicates
+    removes rows repeated anywhere earlier in the sheet, tracking only the
+    64-bit hashes of rows already seen.
+    """
+    from openpyxl import load_workbook
+
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    dedup = StreamingDeduplicator() if drop_duplicates else None
+
+    def prepare(records):
+        batch = _records_to_frame(records, header)
+        if dedup is not None:
+            batch = dedup.filter(batch)
+        return clean_data(batch, verbose=False) if clean else batch
+
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name else wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [str(h) if h is not None else f'column_{i}' for i, h in enumerate(header)]
+        missing = [col for col in RAW_COLUMNS if col not in header]
+        if missing:
+            raise ValueError(f"Worksheet is missing columns: {missing}")
+
+        records = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            records.append(row)
+            if len(records) >= batch_size:
+                batch = prepare(records)
+                records = []
+                yield batch
+
+        if records:
+            yield prepare(records)
+    finally:
+        wb.close()
+
+
+def read_excel_streaming(file_path=DEFAULT_DATA_FILE, batch_size=DEFAULT_BATCH_SIZE,
+                         clean=True, drop_duplicates=False, compact=False, verbose=True):
+    """
+    Read the workbook batch by batch and return the combined DataFrame.
+
+    With clean=True only the cleaned rows of each batch are kept, so peak
+    memory is roughly one raw batch plus the cleaned result. compact=True
+    applies TRANSACTION_SCHEMA to the combined frame.
+    """
+    batches = []
+    total = 0
+    for batch in iter_excel_batches(file_path, batch_size=batch_size, clean=clean,
+                                    drop_duplicates=drop_duplicates):
+        batches.append(batch)
+        total += len(batch)
+        if verbose:
+            print(f"Batch {len(batches)}: {len(batch):,} records ({total:,} total)")
+
+    if not batches:
+        return pd.DataFrame(columns=RAW_COLUMNS)
+    df = pd.concat(batches, ignore_index=True)
+    return apply_schema(df) if compact else df
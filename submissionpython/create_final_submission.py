@@ -1,10 +1,13 @@
 import nbformat
 from nbconvert import HTMLExporter, PDFExporter
-from nbconvert.preprocessors import ExecutePreprocessor
 import markdown
 import os
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from retail_analytics.runner import run_notebooks
+
 def create_submission():
     """Create a professional submission document combining README and notebook outputs"""
     
@@ -100,10 +103,16 @@ def create_submission():
     notebooks = [
         'LalitNayyarIIMKMod4_analysis_fin.ipynb',
         'LalitNayyarIIMKMod4_descriptive_analysis_fin.ipynb',
-        'LalitNayyarIIMKMod4_diagnostic_analysis_fin.ipynb',
+        'LalitNayyarIIMKMod4_behavior_diagnostic_analysis_fin.ipynb',
         'LalitNayyarIIMKMod4_predictive_analysis_fin.ipynb'
     ]
     
+    # Execute the notebooks concurrently so the submission embeds fresh outputs
+    try:
+        run_notebooks([nb for nb in notebooks if os.path.exists(nb)])
+    except Exception as e:
+        print(f"Error executing notebooks: {e}")
+    
     # HTML exporter setup
     html_exporter = HTMLExporter()
     html_exporter.exclude_input_prompt = True
@@ -114,7 +123,7 @@ def create_submission():
             if os.path.exists(notebook_file):
                 print(f"Processing {notebook_file}...")
                 
-                # Read and execute notebook
+                # Read the executed notebook
                 with open(notebook_file, 'r', encoding='utf-8') as f:
                     nb = nbformat.read(f, as_version=4)
                 
@@ -1,10 +1,13 @@
 import nbformat
 import os
+import sys
 from nbconvert import PDFExporter
-from nbconvert.preprocessors import ExecutePreprocessor
 import markdown
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from retail_analytics.runner import run_notebooks
+
 def create_submission():
     """Create submission files using nbconvert"""
     
@@ -39,10 +42,16 @@ def create_submission():
         '00_README.ipynb',
         'LalitNayyarIIMKMod4_analysis_fin.ipynb',
         'LalitNayyarIIMKMod4_descriptive_analysis_fin.ipynb',
-        'LalitNayyarIIMKMod4_diagnostic_analysis_fin.ipynb',
+        'LalitNayyarIIMKMod4_behavior_diagnostic_analysis_fin.ipynb',
         'LalitNayyarIIMKMod4_predictive_analysis_fin.ipynb'
     ]
     
+    # Execute the analysis notebooks concurrently so the HTML has fresh outputs
+    try:
+        run_notebooks([nb for nb in notebooks[1:] if os.path.exists(nb)])
+    except Exception as e:
+        print(f"Error executing notebooks: {e}")
+    
     # Convert each notebook to HTML
     for notebook in notebooks:
         if os.path.exists(notebook):
@@ -0,0 +1,40 @@
+import os
+from pathlib import Path
+
+import nbformat
+
+from retail_analytics.cellcache import run_cached
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _statuses(notebook, cache_dir):
+    report = run_cached(notebook, cache_dir=cache_dir, cell_timeout=60, verbose=False)
+    return report.set_index('cell')['status'].to_dict()
+
+
+def test_cells_rerun_only_when_their_input_file_changes(tmp_path, monkeypatch):
+    # The kernel starts in tmp_path and imports the kernel-side helpers from this checkout
+    monkeypatch.setenv('PYTHONPATH', os.pathsep.join(filter(None, [str(REPO_ROOT),
+                                                                   os.environ.get('PYTHONPATH')])))
+    data = tmp_path / 'orders.csv'
+    data.write_text('amount\n1\n2\n')
+    notebook = tmp_path / 'cached.ipynb'
+    nbformat.write(nbformat.v4.new_notebook(cells=[
+        nbformat.v4.new_code_cell('import pandas as pd'),
+        nbformat.v4.new_code_cell("orders = pd.read_csv('orders.csv')"),
+        nbformat.v4.new_code_cell("total = int(orders['amount'].sum())\ntotal"),
+        nbformat.v4.new_code_cell("label = 'Online Retail'"),
+    ]), str(notebook))
+    cache_dir = tmp_path / 'cells'
+
+    assert _statuses(notebook, cache_dir) == {0: 'uncached', 1: 'executed', 2: 'executed',
+                                              3: 'executed'}
+    assert _statuses(notebook, cache_dir) == {0: 'uncached', 1: 'cached', 2: 'cached',
+                                              3: 'cached'}
+
+    data.write_text('amount\n1\n2\n40\n')
+    assert _statuses(notebook, cache_dir) == {0: 'uncached', 1: 'executed', 2: 'executed',
+                                              3: 'cached'}
+    executed = nbformat.read(str(notebook), as_version=4)
+    assert executed.cells[2].outputs[0]['data']['text/plain'] == '43'
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+
+from retail_analytics.clustering import KMEANS_N_INIT, kmeans_sweep, segment_customers
+
+
+def _blobs(centers, n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.vstack([rng.normal(center, 0.3, size=(n, 2)) for center in centers])
+
+
+def test_min_improvement_stops_at_the_last_k_that_helped():
+    X = _blobs([(0, 0), (10, 0), (0, 10)])
+    _, curve = kmeans_sweep(X, k_values=range(1, 8), n_jobs=1, min_improvement=0.5)
+    assert curve.index.tolist() == [1, 2, 3]
+    inertia = curve['inertia']
+    assert all((inertia[k - 1] - inertia[k]) / inertia[k - 1] >= 0.5 for k in (2, 3))
+
+
+def test_segment_customers_refits_like_the_sweep():
+    X = _blobs([(0, 0), (6, 0), (0, 6), (6, 6)], n=40)
+    features = pd.DataFrame(X, columns=['total_spent', 'purchase_count'])
+    segmented, summary, curve = segment_customers(features, columns=['total_spent', 'purchase_count'],
+                                                  k_values=range(1, 7), n_jobs=1)
+    best_k = segmented['Cluster'].nunique()
+    scaled = (X - X.mean(axis=0)) / X.std(axis=0)
+    expected = KMeans(n_clusters=best_k, random_state=42, n_init=KMEANS_N_INIT).fit(scaled)
+    assert np.isclose(expected.inertia_, curve.loc[best_k, 'inertia'])
+    assert (segmented['Cluster'].to_numpy() == expected.labels_).all()
+    assert summary['customer_count'].sum() == len(features)
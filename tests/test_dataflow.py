@@ -0,0 +1,40 @@
+from retail_analytics.dataflow import cell_dag, downstream
+from retail_analytics.incremental import cell_keys
+
+SOURCES = {
+    0: 'import pandas as pd',
+    1: "orders = pd.read_csv('orders.csv')",
+    2: "returns = pd.read_csv('orders.csv')",
+    3: "total = orders['amount'].sum()",
+    4: "label = 'Online Retail'",
+}
+
+
+def test_cells_reading_the_same_file_stay_in_order():
+    setup, inputs = cell_dag(SOURCES)
+    assert setup == [0]
+    assert inputs[2] == {'<file:orders.csv>': 1}
+    assert inputs[3] == {'orders': 1}
+    assert inputs[4] == {}
+    assert downstream(inputs, [1]) == {1, 2, 3}
+    assert downstream(inputs, [3]) == {3}
+
+
+def test_a_path_known_only_at_run_time_orders_every_file_access():
+    sources = {**SOURCES, 5: "extra = pd.read_csv(path)", 6: "more = pd.read_csv('other.csv')"}
+    _, inputs = cell_dag(sources)
+    assert inputs[5]['<file:orders.csv>'] == 2
+    assert inputs[6]['<file:?>'] == 5
+
+
+def test_cell_keys_follow_the_file_digest(tmp_path):
+    data = tmp_path / 'orders.csv'
+    data.write_text('amount\n1\n2\n')
+    setup, inputs = cell_dag(SOURCES)
+    _, before = cell_keys(SOURCES, setup, inputs, root=tmp_path)
+    _, again = cell_keys(SOURCES, setup, inputs, root=tmp_path)
+    data.write_text('amount\n1\n30\n')
+    _, after = cell_keys(SOURCES, setup, inputs, root=tmp_path)
+
+    assert before == again
+    assert {index for index in before if before[index] != after[index]} == {1, 2, 3}
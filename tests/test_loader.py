@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+from retail_analytics.loader import load_retail_data
+
+
+def test_cold_and_cached_loads_are_identical(tmp_path):
+    workbook = tmp_path / 'Online Retail.xlsx'
+    pd.DataFrame({
+        'InvoiceNo': [536365, 'C536379', 536366],
+        'StockCode': ['85123A', 71053, 84406],
+        'Description': ['WHITE HANGING HEART', 'WHITE METAL LANTERN', None],
+        'Quantity': [6, -1, 8],
+        'InvoiceDate': pd.to_datetime(['2010-12-01 08:26', '2010-12-01 09:41', '2010-12-01 08:28']),
+        'UnitPrice': [2.55, 27.5, 2.75],
+        'CustomerID': [17850.0, 14527.0, np.nan],
+        'Country': ['United Kingdom', 'United Kingdom', 'France'],
+    }).to_excel(workbook, index=False)
+
+    for compact in (False, True):
+        cold = load_retail_data(workbook, tmp_path / 'cache', compact=compact, verbose=False)
+        cached = load_retail_data(workbook, tmp_path / 'cache', compact=compact, verbose=False)
+        assert cold.dtypes.equals(cached.dtypes)
+        assert cold.equals(cached)
+    assert cold['InvoiceNo'].astype(str).tolist() == ['536365', 'C536379', '536366']
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+from retail_analytics.models import make_predictions
+from retail_analytics.registry import ModelRegistry, data_hash, feature_set_hash
+from retail_analytics.service import ScoringService
+
+FEATURES = ['purchase_count', 'avg_order_value']
+
+
+def _register(registry, scale, scaler=True):
+    """Register a model predicting scale * purchase_count and return its key"""
+    X = np.arange(20, dtype=float).reshape(10, 2)
+    y = scale * X[:, 0]
+    fitted_scaler = StandardScaler().fit(X)
+    model = LinearRegression().fit(fitted_scaler.transform(X), y)
+    key = registry.key_for('Linear', model, feature_set_hash(FEATURES), data_hash(X, y))
+    registry.register(key, model, fitted_scaler if scaler else None, name='Linear',
+                      features=FEATURES, metrics={})
+    return key
+
+
+def test_scoring_entry_by_key_ignores_newer_models(tmp_path):
+    registry = ModelRegistry(tmp_path)
+    first = _register(registry, 1.0)
+    _register(registry, 3.0)
+
+    model, scaler, meta = registry.scoring_entry('Linear', key=first)
+    assert meta['key'] == first
+    assert model.predict(scaler.transform([[4.0, 5.0]]))[0] == pytest.approx(4.0)
+
+    features = pd.DataFrame({'purchase_count': [4.0], 'avg_order_value': [5.0],
+                             'total_spent': [4.0]})
+    predictions = make_predictions(features, registry=registry, registry_key=first)
+    assert predictions['Predicted_Revenue'].iloc[0] == pytest.approx(4.0)
+
+
+def test_scoring_entry_rejects_unknown_key_and_missing_scaler(tmp_path):
+    registry = ModelRegistry(tmp_path)
+    with pytest.raises(LookupError):
+        registry.scoring_entry('Linear')
+    with pytest.raises(LookupError):
+        registry.scoring_entry(key='0' * 64)
+
+    key = _register(registry, 1.0, scaler=False)
+    with pytest.raises(ValueError, match='without a scaler'):
+        registry.scoring_entry(key=key)
+    with pytest.raises(ValueError, match='without a scaler'):
+        ScoringService.from_registry('Linear', registry)
@@ -0,0 +1,51 @@
+import nbformat
+import numpy as np
+import pandas as pd
+import pytest
+
+from retail_analytics.runner import RUN_COLUMNS, run_notebooks
+
+
+def _notebook(path, *sources):
+    nb = nbformat.v4.new_notebook(cells=[nbformat.v4.new_code_cell(s) for s in sources])
+    nbformat.write(nb, str(path))
+    return path
+
+
+def _workbook(path):
+    pd.DataFrame({
+        'InvoiceNo': [536365, 536366], 'StockCode': ['85123A', 71053],
+        'Description': ['WHITE HANGING HEART', 'WHITE METAL LANTERN'], 'Quantity': [6, 8],
+        'InvoiceDate': pd.to_datetime(['2010-12-01 08:26', '2010-12-01 09:41']),
+        'UnitPrice': [2.55, 3.39], 'CustomerID': [17850.0, np.nan],
+        'Country': ['United Kingdom', 'France'],
+    }).to_excel(path, index=False)
+    return path
+
+
+def test_run_notebooks_with_no_notebooks_returns_an_empty_frame():
+    results = run_notebooks([], verbose=False)
+    assert results.empty and list(results.columns) == RUN_COLUMNS
+
+
+def test_run_notebooks_rejects_missing_notebooks(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        run_notebooks([tmp_path / 'missing.ipynb'], verbose=False)
+
+
+def test_run_notebooks_records_failures_and_warms_the_data_cache(tmp_path):
+    ok = _notebook(tmp_path / 'ok.ipynb', 'answer = 6 * 7', 'answer')
+    bad = _notebook(tmp_path / 'bad.ipynb', "raise ValueError('boom')")
+    data_cache = tmp_path / 'data-cache'
+
+    results = run_notebooks([ok, bad], tmp_path / 'out', max_workers=1, cell_timeout=60,
+                            data_file=_workbook(tmp_path / 'data.xlsx'),
+                            data_cache_dir=data_cache, verbose=False).set_index('notebook')
+
+    assert results.loc['ok.ipynb', 'status'] == 'ok'
+    assert results.loc['bad.ipynb', 'status'] == 'error'
+    assert 'boom' in results.loc['bad.ipynb', 'error']
+    executed = nbformat.read(str(tmp_path / 'out' / 'ok.ipynb'), as_version=4)
+    assert executed.cells[1].outputs[0]['data']['text/plain'] == '42'
+    assert not (tmp_path / 'out' / 'bad.ipynb').exists()
+    assert sorted(p.name.split('-')[1] for p in data_cache.glob('*.parquet')) == ['clean', 'raw']
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+from retail_analytics.scoring import iter_customer_chunks, score_customers
+
+FEATURES = ['purchase_count', 'avg_order_value']
+
+
+def _customer_features(n=250):
+    rng = np.random.default_rng(0)
+    features = pd.DataFrame({
+        'CustomerID': np.arange(12000, 12000 + n, dtype=np.int64),
+        'purchase_count': rng.integers(1, 50, n).astype(float),
+        'avg_order_value': rng.gamma(2.0, 20.0, n),
+    })
+    features['total_spent'] = features['purchase_count'] * features['avg_order_value']
+    return features
+
+
+def _fitted(features):
+    X = features[FEATURES].to_numpy()
+    scaler = StandardScaler().fit(X)
+    model = LinearRegression().fit(scaler.transform(X), features['total_spent'])
+    return model, scaler
+
+
+def test_parquet_chunks_are_indexed_by_customer_id(tmp_path):
+    features = _customer_features()
+    source = tmp_path / 'features.parquet'
+    features.to_parquet(source, index=False)
+
+    chunks = list(iter_customer_chunks(source, chunk_size=64))
+    assert len(chunks) == 4
+    assert pd.concat(chunks).index.tolist() == features['CustomerID'].tolist()
+
+
+def test_score_customers_keeps_ids_across_chunks(tmp_path):
+    features = _customer_features()
+    source = tmp_path / 'features.parquet'
+    output = tmp_path / 'scores.parquet'
+    features.to_parquet(source, index=False)
+    model, scaler = _fitted(features)
+
+    top, n_scored = score_customers(source, model, scaler, FEATURES, target='total_spent',
+                                    output_path=output, chunk_size=64, top_n=5)
+
+    expected = pd.Series(model.predict(scaler.transform(features[FEATURES].to_numpy())),
+                         index=features['CustomerID'])
+    assert n_scored == len(features)
+    assert top.index.tolist() == expected.nlargest(5).index.tolist()
+    np.testing.assert_allclose(top['Predicted_Revenue'], expected.nlargest(5))
+
+    scores = pq.read_table(output).to_pandas()
+    assert scores.index.name == 'CustomerID'
+    assert scores.index.tolist() == features['CustomerID'].tolist()
+    np.testing.assert_allclose(scores['Predicted_Revenue'], expected.to_numpy())
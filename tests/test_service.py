@@ -0,0 +1,51 @@
+import threading
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+from retail_analytics.service import ScoringService
+
+FEATURES = ['purchase_count', 'avg_order_value']
+
+
+def _service(**kwargs):
+    X = np.arange(20, dtype=float).reshape(10, 2)
+    scaler = StandardScaler().fit(X)
+    model = LinearRegression().fit(scaler.transform(X), X.sum(axis=1))
+    return ScoringService(model, scaler, FEATURES, **kwargs)
+
+
+def test_bad_request_is_rejected_without_failing_its_batch():
+    service = _service(max_wait_ms=200)
+    results, errors = {}, {}
+
+    def call(i, rows):
+        try:
+            results[i] = service.predict(rows)
+        except ValueError as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=call, args=(i, [[i, 1.0]])) for i in range(4)]
+    threads.append(threading.Thread(target=call, args=('bad', [[1.0, 2.0, 3.0]])))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert list(errors) == ['bad']
+    for i in range(4):
+        assert results[i] == pytest.approx([i + 1.0])
+    stats = service.stats()
+    assert stats['requests'] == 4
+    assert stats['rows'] == 4
+
+
+def test_rows_from_accepts_mappings_and_a_single_row():
+    service = _service()
+    rows = service.rows_from({'features': {'avg_order_value': 2.0, 'purchase_count': 1.0}})
+    assert rows.tolist() == [[1.0, 2.0]]
+    assert service.check_rows([1.0, 2.0]).shape == (1, 2)
+    with pytest.raises(ValueError, match='Expected 2 features'):
+        service.rows_from({'instances': [[1.0]]})